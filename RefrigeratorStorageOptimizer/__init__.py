@@ -1,3 +1,7 @@
-# from .celery import app as celery_app
+# Celery is optional: without it (or without a broker) background jobs run in-process
+try:
+    from .celery import app as celery_app
+except ImportError:
+    celery_app = None
 
-# __all__ = ("celery_app",)
+__all__ = ("celery_app",)
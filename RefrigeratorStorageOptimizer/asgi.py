@@ -3,6 +3,10 @@ ASGI config for RefrigeratorStorageOptimizer project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. ``uvicorn RefrigeratorStorageOptimizer.asgi:application``)
+so async views such as ``user/video_feed_async/`` can hold many concurrent streams
+in a single process.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -14,3 +18,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'RefrigeratorStorageOptimizer.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.DETECTION_MODEL_PRELOAD:
+    from user.detection import yolo_provider  # noqa: E402
+
+    yolo_provider.preload()
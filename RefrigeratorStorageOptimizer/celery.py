@@ -0,0 +1,13 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "RefrigeratorStorageOptimizer.settings")
+
+app = Celery("RefrigeratorStorageOptimizer")
+
+# Read every CELERY_* setting from Django settings (e.g. CELERY_BROKER_URL)
+app.config_from_object("django.conf:settings", namespace="CELERY")
+
+# Load tasks.py from all installed apps
+app.autodiscover_tasks()
@@ -112,6 +112,43 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# Local memory cache by default; set CACHE_REDIS_URL to share one across workers
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "optimizee",
+        }
+    }
+# Redis used to fan food-item events out to SSE streams across processes;
+# without it events only reach streams served by the publishing process
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", CACHE_REDIS_URL)
+EVENTS_KEEPALIVE = int(os.getenv("EVENTS_KEEPALIVE", 15))  # seconds
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))  # per open stream
+# Seconds a user's serialized dashboard stays cached (edits invalidate it sooner).
+# A local memory cache is per process and only hears about edits handled by that
+# process, so without Redis entries must expire quickly
+DASHBOARD_CACHE_TTL = int(
+    os.getenv("DASHBOARD_CACHE_TTL", 60 * 60 * 24 if CACHE_REDIS_URL else 30)
+)
+if not CACHE_REDIS_URL:
+    DASHBOARD_CACHE_TTL = min(DASHBOARD_CACHE_TTL, 30)
+
+# Seconds fitted purchase-forecast parameters are kept (new purchase months refit)
+FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", 60 * 60 * 24 * 7))
+
+# Page sizes for the cursor-paginated dashboard_data endpoint
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", 50))
+DASHBOARD_MAX_PAGE_SIZE = int(os.getenv("DASHBOARD_MAX_PAGE_SIZE", 500))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),  # Short expiry
     "REFRESH_TOKEN_LIFETIME": timedelta(days=2),  # Refresh lasts longer
@@ -174,6 +211,65 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Object detection model, loaded lazily on first use
+DETECTION_MODEL_WEIGHTS = os.getenv("DETECTION_MODEL_WEIGHTS", "yolov8n.pt")
+# One of "ultralytics" (PyTorch), "onnx" (ONNX Runtime) or "onnx-int8" (quantized)
+DETECTION_BACKEND = os.getenv("DETECTION_BACKEND", "ultralytics")
+# Square input resolution the detector runs at; smaller is faster on CPU
+DETECTION_IMGSZ = int(os.getenv("DETECTION_IMGSZ", 640))
+# Batch detection endpoint: frames per inference call, pool size and upload limit
+DETECTION_BATCH_SIZE = int(os.getenv("DETECTION_BATCH_SIZE", 8))
+DETECTION_BATCH_WORKERS = int(
+    os.getenv("DETECTION_BATCH_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+)
+DETECTION_BATCH_MAX_IMAGES = int(os.getenv("DETECTION_BATCH_MAX_IMAGES", 64))
+# Run one dummy inference right after loading so the first frame isn't slow
+DETECTION_MODEL_WARMUP = os.getenv("DETECTION_MODEL_WARMUP", "False") == "True"
+# Load the model in wsgi.py, before a preforking server (gunicorn --preload) forks
+DETECTION_MODEL_PRELOAD = os.getenv("DETECTION_MODEL_PRELOAD", "False") == "True"
+
+# Object detection stream
+# Run YOLO on every Nth captured frame; skipped frames reuse the last boxes
+DETECTION_INFERENCE_STRIDE = int(os.getenv("DETECTION_INFERENCE_STRIDE", 3))
+# Fraction of changed pixels needed before the scene is re-detected (0 disables)
+DETECTION_MOTION_THRESHOLD = float(os.getenv("DETECTION_MOTION_THRESHOLD", 0.02))
+# Detected objects are written with bulk_create once either threshold is reached
+DETECTION_SINK_BATCH_SIZE = int(os.getenv("DETECTION_SINK_BATCH_SIZE", 100))
+DETECTION_SINK_FLUSH_INTERVAL = float(os.getenv("DETECTION_SINK_FLUSH_INTERVAL", 2.0))
+# A tracked object is stored once it goes unseen for this many inferred frames
+DETECTION_TRACK_MAX_MISSES = int(os.getenv("DETECTION_TRACK_MAX_MISSES", 5))
+
+# Expiry-date extraction
+# Dotted path to a callable returning the vision model; use
+# "user.expiry.StaticExpiryModel" to run offline against a fake model
+EXPIRY_MODEL = os.getenv("EXPIRY_MODEL", "user.expiry.gemini_model")
+EXPIRY_STATIC_DATE = os.getenv("EXPIRY_STATIC_DATE", "31st Dec 2099")
+# Extracted dates are cached by image hash for this many seconds
+EXPIRY_CACHE_TTL = int(os.getenv("EXPIRY_CACHE_TTL", 60 * 60 * 24 * 30))
+# Max perceptual-hash bit distance at which a similar photo's date is used as a
+# fallback when the model call fails (0 disables)
+EXPIRY_CACHE_PHASH_DISTANCE = int(os.getenv("EXPIRY_CACHE_PHASH_DISTANCE", 0))
+# Items uploaded with a photo get this provisional expiry until extraction finishes
+EXPIRY_PROVISIONAL_DAYS = int(os.getenv("EXPIRY_PROVISIONAL_DAYS", 5))
+# In-process extraction workers, used when no Celery broker is configured
+EXPIRY_EXTRACTION_WORKERS = int(os.getenv("EXPIRY_EXTRACTION_WORKERS", 4))
+
+# Processes that fix orientation and build WebP variants of uploaded food images
+IMAGE_INGEST_WORKERS = int(os.getenv("IMAGE_INGEST_WORKERS", 2))
+
+# Celery (optional); leave the broker unset to run background jobs in-process
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "")
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    "sweep-expiry-statuses": {
+        "task": "user.sweep_expiry_statuses",
+        "schedule": float(os.getenv("STATUS_SWEEP_INTERVAL", 60 * 60)),  # seconds
+    },
+}
+# Rows per UPDATE in the expiry-status sweep
+STATUS_SWEEP_CHUNK_SIZE = int(os.getenv("STATUS_SWEEP_CHUNK_SIZE", 1000))
+
 LOGIN_URL = "/auth/login/"
 LOGIN_REDIRECT_URL = "user/dashboard/"
 LOGOUT_REDIRECT_URL = "/auth/login/"
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'RefrigeratorStorageOptimizer.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.DETECTION_MODEL_PRELOAD:
+    from user.detection import yolo_provider  # noqa: E402
+
+    yolo_provider.preload()
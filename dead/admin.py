@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import MonthlyConsumption
 
 # Register your models here.
+
+
+@admin.register(MonthlyConsumption)
+class MonthlyConsumptionAdmin(admin.ModelAdmin):
+    list_display = ("user", "food_item", "year", "month", "bought", "used", "wasted")
+    list_filter = ("year", "month")
+    search_fields = ("food_item__name", "user__username")
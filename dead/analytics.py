@@ -0,0 +1,99 @@
+import logging
+
+import pandas as pd
+from django.db.models import F, Sum
+
+from user.models import FoodItem
+from .models import MonthlyConsumption
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+
+CONSUMPTION_COLUMNS = ["food_item", "year", "month", "bought", "used", "wasted"]
+
+
+def monthly_consumption(user):
+    """
+    Bought, used, wasted and net consumed quantity per food item and month.
+
+    Read from the ``MonthlyConsumption`` rollup (one row per item and month)
+    rather than aggregated from raw purchases, returned as a DataFrame with
+    the ``CONSUMPTION_COLUMNS`` plus net.
+    """
+    rows = (
+        MonthlyConsumption.objects.filter(user=user)
+        .values_list(*CONSUMPTION_COLUMNS)
+        .order_by()
+    )
+    frame = pd.DataFrame.from_records(rows, columns=CONSUMPTION_COLUMNS)
+    frame["net"] = frame["bought"] - frame["wasted"]
+    return frame
+
+
+def optimal_quantities(user):
+    """
+    Suggested monthly quantity per food item: the mean net consumption per month,
+    truncated to a whole number. Items without purchases get 0.
+    """
+    frame = monthly_consumption(user)
+    means = frame.groupby("food_item")["net"].mean()
+    return means.astype(int).to_dict()
+
+
+def shopping_list(user):
+    """The user's food items with their optimal quantity, for the cart view."""
+    quantities = optimal_quantities(user)
+    storage = FoodItem._meta.get_field("image").storage
+    return [
+        {
+            "name": item["name"],
+            "quantity": quantities.get(item["id"], 0),
+            "image_url": storage.url(item["image"]) if item["image"] else None,
+        }
+        for item in FoodItem.objects.filter(user=user).values("id", "name", "image")
+    ]
+
+
+# Named apart from the rollup's own columns, which annotations may not shadow
+WASTE_TOTALS = {
+    "wasted_quantity": Sum("wasted"),
+    "waste_cost": Sum("wasted_cost"),
+    "spend": Sum("spent"),
+}
+
+
+def waste_costs(user, year=None):
+    """
+    Cost of wasted food by month, category and item.
+
+    Grouped sums over the user's ``MonthlyConsumption`` rows, done entirely in
+    the database; no purchase rows are loaded.
+    """
+    rollups = MonthlyConsumption.objects.filter(user=user)
+    if year is not None:
+        rollups = rollups.filter(year=year)
+
+    return {
+        "total": rollups.aggregate(**WASTE_TOTALS),
+        "by_month": list(
+            rollups.values("year", "month")
+            .annotate(**WASTE_TOTALS)
+            .order_by("year", "month")
+        ),
+        "by_category": list(
+            rollups.values(category=F("food_item__category"))
+            .annotate(**WASTE_TOTALS)
+            .order_by("-waste_cost")
+        ),
+        "by_item": list(
+            rollups.values(
+                "food_item",
+                name=F("food_item__name"),
+                category=F("food_item__category"),
+            )
+            .annotate(**WASTE_TOTALS)
+            .order_by("-waste_cost")
+        ),
+    }
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DeadConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dead'
+
+    def ready(self):
+        import dead.signals
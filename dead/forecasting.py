@@ -0,0 +1,159 @@
+import logging
+import math
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from user.models import FoodItem
+from .analytics import monthly_consumption
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "forecast"
+SEASON = 12  # months
+# Candidate level smoothing factors; the best one is picked per item
+ALPHAS = np.round(np.linspace(0.1, 0.9, 9), 2)
+SEASONAL_GAMMA = 0.2
+# Items need two full years of history before a seasonal term is fitted
+SEASONAL_MIN_MONTHS = 2 * SEASON
+
+
+def period(year, month):
+    """Months since year 0, so consecutive months are consecutive integers."""
+    return year * 12 + month - 1
+
+
+def consumption_matrix(frame, through):
+    """
+    Items x months array of net consumption from ``monthly_consumption``.
+
+    Columns run up to period ``through`` (the last complete month) even when
+    the last purchase is older; months without purchases count as zero, later
+    months are dropped. Returns (item ids, first period, values, started) where
+    ``started`` masks the months before each item's first purchase.
+    """
+    frame = frame.assign(period=period(frame["year"], frame["month"]))
+    frame = frame[frame["period"] <= through]
+    pivot = frame.pivot_table(
+        index="food_item", columns="period", values="net", aggfunc="sum"
+    )
+    first = int(pivot.columns.min())
+    pivot = pivot.reindex(columns=range(first, through + 1))
+    observed = pivot.notna().to_numpy()
+    started = np.maximum.accumulate(observed, axis=1)
+    return list(pivot.index), first, pivot.fillna(0).to_numpy(float), started
+
+
+def smooth(values, started, first, alphas, seasonal):
+    """
+    Additive exponential smoothing of every item at once.
+
+    Column ``t`` of ``values`` is period ``first + t``. ``alphas`` broadcasts
+    against (candidates, items); ``seasonal`` is a per-item mask. Returns the
+    one-step-ahead squared error, the final level and the seasonal offsets,
+    each with a leading candidates axis.
+    """
+    items, months = values.shape
+    alphas = np.asarray(alphas, dtype=float)
+    candidates = alphas.shape[0]
+    first_values = values[np.arange(items), started.argmax(axis=1)]
+
+    level = np.broadcast_to(first_values, (candidates, items)).copy()
+    season = np.zeros((candidates, items, SEASON))
+    sse = np.zeros((candidates, items))
+    for t in range(months):
+        active = started[:, t]
+        slot = (first + t) % SEASON  # calendar month
+        offset = season[:, :, slot]
+        error = values[:, t] - (level + offset)
+        sse += np.where(active, error**2, 0.0)
+        level = np.where(active, level + alphas * error, level)
+        season[:, :, slot] = np.where(
+            active & seasonal, offset + SEASONAL_GAMMA * (1 - alphas) * error, offset
+        )
+    return sse, level, season
+
+
+def fit(values, started, first):
+    """Picks each item's smoothing factor by lowest in-sample error."""
+    seasonal = started.sum(axis=1) >= SEASONAL_MIN_MONTHS
+    sse, _, _ = smooth(values, started, first, ALPHAS[:, None], seasonal)
+    return ALPHAS[sse.argmin(axis=0)], seasonal
+
+
+def _signature(item_ids, first, values):
+    # refit once a new month (or a new item) shows up in the history
+    return (first + values.shape[1] - 1, tuple(item_ids))
+
+
+def fitted_parameters(user_id, item_ids, first, values, started):
+    """
+    Smoothing parameters for the user's items, cached until the purchase
+    history gains a month or an item.
+    """
+    key = f"{CACHE_PREFIX}:params:{user_id}"
+    signature = _signature(item_ids, first, values)
+    cached = cache.get(key)
+    if cached is not None and cached["signature"] == signature:
+        return cached["alphas"], cached["seasonal"]
+
+    alphas, seasonal = fit(values, started, first)
+    cache.set(
+        key,
+        {"signature": signature, "alphas": alphas, "seasonal": seasonal},
+        settings.FORECAST_CACHE_TTL,
+    )
+    logger.info(f"Refitted forecasts of {len(item_ids)} items for user {user_id}")
+    return alphas, seasonal
+
+
+def forecast_next_month(user, today=None):
+    """
+    Forecast net consumption of each food item in the coming month.
+
+    Only complete months are fitted; the running month would read as a drop in
+    consumption. Returns ``{food_item_id: {"forecast", "alpha", "seasonal"}}``;
+    items without purchases before this month are left out.
+    """
+    today = today or timezone.now().date()
+    current = period(today.year, today.month)
+    frame = monthly_consumption(user)
+    frame = frame[period(frame["year"], frame["month"]) < current]
+    if frame.empty:
+        return {}
+
+    item_ids, first, values, started = consumption_matrix(frame, through=current - 1)
+    alphas, seasonal = fitted_parameters(user.id, item_ids, first, values, started)
+    _, level, season = smooth(values, started, first, alphas[None, :], seasonal)
+
+    target = current + 1
+    forecast = level[0] + season[0, :, target % SEASON]
+    return {
+        item_id: {
+            "forecast": round(float(forecast[i]), 2),
+            "alpha": float(alphas[i]),
+            "seasonal": bool(seasonal[i]),
+        }
+        for i, item_id in enumerate(item_ids)
+    }
+
+
+def recommendations(user, today=None):
+    """Recommended purchase quantity for next month per food item."""
+    forecasts = forecast_next_month(user, today)
+    result = []
+    for item in FoodItem.objects.filter(user=user).values("id", "name"):
+        forecast = forecasts.get(item["id"])
+        result.append(
+            {
+                "id": item["id"],
+                "name": item["name"],
+                "quantity": math.ceil(max(forecast["forecast"], 0)) if forecast else 0,
+                "forecast": forecast,
+            }
+        )
+    return result
@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from dead.rollup import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the monthly consumption rollup from FoodItemPurchase rows, "
+        "for backfills or after purchases were changed with bulk updates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Only rebuild this user's rows")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["username"]:
+            try:
+                user = User.objects.get(username=options["username"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['username']}")
+
+        rows = rebuild(user)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} monthly rollup rows"))
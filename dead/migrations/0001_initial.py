@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('user', '0010_fooditem_active_expiry_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyConsumption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField(choices=[(1, 'January'), (2, 'February'), (3, 'March'), (4, 'April'), (5, 'May'), (6, 'June'), (7, 'July'), (8, 'August'), (9, 'September'), (10, 'October'), (11, 'November'), (12, 'December')])),
+                ('bought', models.IntegerField(default=0)),
+                ('used', models.IntegerField(default=0)),
+                ('wasted', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('food_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_consumption', to='user.fooditem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_consumption', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+                'indexes': [models.Index(fields=['user', 'year', 'month'], name='consumption_user_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('food_item', 'year', 'month'), name='monthly_consumption_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dead', '0001_initial'),
+        ('user', '0011_fooditempurchase_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyconsumption',
+            name='spent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='monthlyconsumption',
+            name='wasted_cost',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+    ]
@@ -1,3 +1,48 @@
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+from user.models import FoodItem, FoodItemPurchase
+
+
+class MonthlyConsumption(models.Model):
+    """
+    Bought, used and wasted totals (and their cost) of one food item in one month.
+
+    Kept in step with ``FoodItemPurchase`` by signals (see ``dead.signals``);
+    ``manage.py rebuild_consumption_rollup`` recomputes it from scratch.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="monthly_consumption"
+    )
+    food_item = models.ForeignKey(
+        FoodItem, on_delete=models.CASCADE, related_name="monthly_consumption"
+    )
+    year = models.IntegerField()
+    month = models.IntegerField(choices=FoodItemPurchase.MONTH_CHOICES)
+    bought = models.IntegerField(default=0)
+    used = models.IntegerField(default=0)
+    wasted = models.IntegerField(default=0)
+    spent = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0
+    )  # quantity * price of the month's purchases
+    wasted_cost = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0
+    )  # wasted_quantity * price
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-year", "-month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["food_item", "year", "month"], name="monthly_consumption_key"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "year", "month"], name="consumption_user_month_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.food_item_id} {self.year}-{self.month:02d}: {self.bought} bought"
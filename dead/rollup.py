@@ -0,0 +1,130 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from user.models import FoodItemPurchase
+from .models import MonthlyConsumption
+
+
+KEY_FIELDS = ["food_item_id", "year_bought", "month_bought"]
+# Purchase fields the rollup depends on
+STATE_FIELDS = KEY_FIELDS + ["quantity", "used_quantity", "wasted_quantity", "price"]
+TOTAL_FIELDS = ["bought", "used", "wasted", "spent", "wasted_cost"]
+
+
+def purchase_totals(purchase):
+    """Rollup totals contributed by one purchase."""
+    price = purchase["price"] or Decimal(0)
+    return {
+        "bought": purchase["quantity"] or 0,
+        "used": purchase["used_quantity"] or 0,
+        "wasted": purchase["wasted_quantity"] or 0,
+        "spent": (purchase["quantity"] or 0) * price,
+        "wasted_cost": (purchase["wasted_quantity"] or 0) * price,
+    }
+
+
+def apply_delta(user_id, purchase, sign, create=True):
+    """
+    Adds (``sign`` 1) or removes (``sign`` -1) one purchase's totals.
+
+    The month's row is created on demand unless ``create`` is False, which
+    removals use: their row may already be gone with its deleted food item.
+    """
+    totals = purchase_totals(purchase)
+    if not any(totals.values()):
+        return
+    key = {
+        "food_item_id": purchase["food_item_id"],
+        "year": purchase["year_bought"],
+        "month": purchase["month_bought"],
+    }
+    changes = {field: F(field) + sign * value for field, value in totals.items()}
+    if MonthlyConsumption.objects.filter(**key).update(**changes):
+        if not create:
+            # a month whose last purchase was removed no longer counts at all
+            MonthlyConsumption.objects.filter(
+                **key, **dict.fromkeys(TOTAL_FIELDS, 0)
+            ).delete()
+        return
+    if not create:
+        return
+    MonthlyConsumption.objects.get_or_create(**key, defaults={"user_id": user_id})
+    MonthlyConsumption.objects.filter(**key).update(**changes)
+
+
+def purchase_state(purchase):
+    """The fields of a purchase the rollup depends on, as a dict."""
+    return {field: getattr(purchase, field) for field in STATE_FIELDS}
+
+
+def record_change(user_id, old, new):
+    """
+    Moves a purchase's contribution from its ``old`` to its ``new`` state.
+
+    Either side may be None for a created or deleted purchase.
+    """
+    with transaction.atomic():
+        if old is not None:
+            apply_delta(user_id, old, -1, create=False)
+        if new is not None:
+            apply_delta(user_id, new, 1)
+
+
+def cost(quantity_field):
+    """SQL ``SUM(COALESCE(quantity, 0) * price)`` over purchases."""
+    money = DecimalField(max_digits=14, decimal_places=2)
+    return Coalesce(
+        Sum(Coalesce(F(quantity_field), 0) * F("price"), output_field=money),
+        Value(Decimal(0)),
+        output_field=money,
+    )
+
+
+def rebuild(user=None):
+    """
+    Recomputes the rollup from raw purchases with one grouped aggregate.
+
+    Limited to ``user`` when given; returns the number of rows written.
+    """
+    purchases = FoodItemPurchase.objects.all()
+    rollups = MonthlyConsumption.objects.all()
+    if user is not None:
+        purchases = purchases.filter(food_item__user=user)
+        rollups = rollups.filter(user=user)
+
+    totals = (
+        purchases.values(
+            "food_item_id", "food_item__user_id", "year_bought", "month_bought"
+        )
+        .annotate(
+            bought=Coalesce(Sum("quantity"), 0),
+            used=Coalesce(Sum("used_quantity"), 0),
+            wasted=Coalesce(Sum("wasted_quantity"), 0),
+            spent=cost("quantity"),
+            wasted_cost=cost("wasted_quantity"),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = MonthlyConsumption.objects.bulk_create(
+            [
+                MonthlyConsumption(
+                    user_id=row["food_item__user_id"],
+                    food_item_id=row["food_item_id"],
+                    year=row["year_bought"],
+                    month=row["month_bought"],
+                    bought=row["bought"],
+                    used=row["used"],
+                    wasted=row["wasted"],
+                    spent=row["spent"],
+                    wasted_cost=row["wasted_cost"],
+                )
+                for row in totals
+            ],
+            batch_size=1000,
+        )
+    return len(created)
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from user.models import FoodItemPurchase
+from . import rollup
+
+
+@receiver(pre_save, sender=FoodItemPurchase)
+def remember_purchase_state(sender, instance, **kwargs):
+    # an edit may move quantities between months, so keep what was stored
+    instance._rollup_previous = (
+        sender.objects.filter(pk=instance.pk).values(*rollup.STATE_FIELDS).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=FoodItemPurchase)
+def roll_up_purchase(sender, instance, **kwargs):
+    rollup.record_change(
+        instance.food_item.user_id,
+        getattr(instance, "_rollup_previous", None),
+        rollup.purchase_state(instance),
+    )
+
+
+@receiver(post_delete, sender=FoodItemPurchase)
+def roll_up_deleted_purchase(sender, instance, **kwargs):
+    rollup.record_change(None, rollup.purchase_state(instance), None)
@@ -1,3 +1,71 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
+from user.models import FoodItem
+from .forecasting import forecast_next_month, recommendations
+from .models import MonthlyConsumption
+
 # Create your tests here.
+
+# Oct 2025 - Sep 2026, the twelve complete months before TODAY
+MONTHS = [(2025, month) for month in range(10, 13)] + [
+    (2026, month) for month in range(1, 10)
+]
+TODAY = date(2026, 10, 3)
+
+
+class ForecastTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("forecast", password="secret")
+        self.item = FoodItem.objects.create(
+            user=self.user, name="Milk", expiration_date=TODAY
+        )
+
+    def history(self, bought, wasted=None, months=MONTHS):
+        wasted = wasted or [0] * len(bought)
+        MonthlyConsumption.objects.bulk_create(
+            MonthlyConsumption(
+                user=self.user,
+                food_item=self.item,
+                year=year,
+                month=month,
+                bought=b,
+                wasted=w,
+            )
+            for (year, month), b, w in zip(months, bought, wasted)
+        )
+
+    def recommended(self):
+        (row,) = recommendations(self.user, today=TODAY)
+        return row["quantity"]
+
+    def test_steady_history(self):
+        self.history([10] * 12, [1] * 12)
+        forecast = forecast_next_month(self.user, today=TODAY)[self.item.id]
+        self.assertAlmostEqual(forecast["forecast"], 9, places=1)
+        self.assertEqual(self.recommended(), 9)
+
+    def test_rising_history(self):
+        self.history([2 * i for i in range(1, 13)])
+        # no trend term, so the level lags the last month (24) slightly
+        self.assertGreaterEqual(self.recommended(), 22)
+
+    def test_running_month_is_ignored(self):
+        self.history([10] * 12, [1] * 12)
+        self.history([1], months=[(TODAY.year, TODAY.month)])
+        forecast = forecast_next_month(self.user, today=TODAY)[self.item.id]
+        self.assertAlmostEqual(forecast["forecast"], 9, places=1)
+
+    def test_months_without_purchases_count_as_zero(self):
+        self.history([10] * 9, months=MONTHS[:9])
+        forecast = forecast_next_month(self.user, today=TODAY)[self.item.id]
+        self.assertLess(forecast["forecast"], 10)
+
+    def test_no_complete_month(self):
+        self.history([5], months=[(TODAY.year, TODAY.month)])
+        self.assertEqual(forecast_next_month(self.user, today=TODAY), {})
+        self.assertEqual(self.recommended(), 0)
@@ -1,9 +1,11 @@
 from django.urls import path
-from .views import generate_map, calculate, cart, spline
+from .views import generate_map, calculate, recommend, waste_cost, cart, spline
 
 urlpatterns = [
     path("generate_map/", generate_map, name="generate_map"),
     path("calculate/", calculate, name="calculate"),
+    path("recommendations/", recommend, name="recommendations"),
+    path("waste-cost/", waste_cost, name="waste_cost"),
     path("cart/", cart, name="cart"),
     path("spline/", spline, name="spline"),
 ]
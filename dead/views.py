@@ -4,11 +4,16 @@ import logging
 from django.shortcuts import render
 from django import forms
 from django.http import JsonResponse
-from django.db.models import Sum, F
-from django.db.models.functions import Coalesce
-from user.models import FoodItem, FoodItemPurchase
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .analytics import shopping_list, waste_costs
+from .forecasting import recommendations
 
-from statistics import mean
 import pandas as pd
 import geopandas as gpd
 import folium
@@ -245,35 +250,41 @@ def generate_map(request):
         )
 
 
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
 def calculate(request):
-    food_items = FoodItem.objects.all()
-    result = []
-
-    for food_item in food_items:
-        monthly_data = (
-            FoodItemPurchase.objects.filter(food_item=food_item)
-            .values("year_bought", "month_bought")
-            .annotate(
-                total_bought=Coalesce(Sum("quantity_bought"), 0),
-                total_wasted=Coalesce(Sum("amount_wasted"), 0),
-                net_consumed=F("total_bought") - F("total_wasted"),
-            )
-        )
-
-        monthly_consumption = [entry["net_consumed"] for entry in monthly_data]
-        optimal_consumption = (
-            int(mean(monthly_consumption)) if monthly_consumption else 0
-        )
-
-        result.append(
-            {
-                "name": food_item.name,
-                "quantity": optimal_consumption,
-                "image_url": food_item.image.url if food_item.image else None,
-            }
-        )
-
-    return JsonResponse(result, safe=False)
+    """
+    Optimal monthly quantity of each of the user's food items.
+
+    Two queries in total: the user's monthly consumption rollup rows and the
+    items themselves.
+    """
+    return JsonResponse(shopping_list(request.user), safe=False)
+
+
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def recommend(request):
+    """
+    Recommended purchase quantity of each food item for next month.
+
+    Forecast by exponential smoothing (seasonal with two years of history)
+    fitted across all of the user's items at once.
+    """
+    return JsonResponse(recommendations(request.user), safe=False)
+
+
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def waste_cost(request):
+    """Wasted quantity and cost by month, category and item; ``?year=`` filters."""
+    year = request.query_params.get("year")
+    if year and not year.isdigit():
+        return JsonResponse({"error": "year must be a number"}, status=400)
+    return JsonResponse(waste_costs(request.user, int(year) if year else None))
 
 
 def cart(request):
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooddonation',
+            name='food_image_medium',
+            field=models.ImageField(blank=True, null=True, upload_to='food_images/variants/'),
+        ),
+        migrations.AddField(
+            model_name='fooddonation',
+            name='food_image_thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='food_images/variants/'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:20
+
+import user.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donation', '0002_fooddonation_image_variants'),
+        ('user', '0007_storedblob_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fooddonation',
+            name='food_image',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.food_image_storage, upload_to='food_images/'),
+        ),
+        migrations.AlterField(
+            model_name='fooddonation',
+            name='food_image_medium',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.food_image_storage, upload_to='food_images/variants/'),
+        ),
+        migrations.AlterField(
+            model_name='fooddonation',
+            name='food_image_thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.food_image_storage, upload_to='food_images/variants/'),
+        ),
+    ]
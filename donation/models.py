@@ -1,5 +1,7 @@
 from django.db import models
 
+from user.storage import food_image_storage
+
 
 class FoodDonation(models.Model):
     FOOD_CATEGORIES = [
@@ -17,7 +19,21 @@ class FoodDonation(models.Model):
     category = models.CharField(max_length=50, choices=FOOD_CATEGORIES)
     expiry_date = models.DateField()
     location = models.CharField(max_length=250)
-    food_image = models.ImageField(upload_to="food_images/", blank=True, null=True)
+    food_image = models.ImageField(
+        upload_to="food_images/", storage=food_image_storage, blank=True, null=True
+    )
+    food_image_medium = models.ImageField(
+        upload_to="food_images/variants/",
+        storage=food_image_storage,
+        blank=True,
+        null=True,
+    )  # ~800px WebP copy of food_image
+    food_image_thumbnail = models.ImageField(
+        upload_to="food_images/variants/",
+        storage=food_image_storage,
+        blank=True,
+        null=True,
+    )  # ~200px WebP copy of food_image
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
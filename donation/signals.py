@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from user.storage import release_files, release_replaced_files, remember_files
+from .models import FoodDonation
+
+IMAGE_FIELDS = ["food_image", "food_image_medium", "food_image_thumbnail"]
+
+
+@receiver(post_delete, sender=FoodDonation)
+def release_food_donation_images(sender, instance, **kwargs):
+    release_files(instance, *IMAGE_FIELDS)
+
+
+@receiver(pre_save, sender=FoodDonation)
+def remember_food_donation_images(sender, instance, update_fields=None, **kwargs):
+    remember_files(instance, *IMAGE_FIELDS, update_fields=update_fields)
+
+
+@receiver(post_save, sender=FoodDonation)
+def release_replaced_food_donation_images(sender, instance, **kwargs):
+    release_replaced_files(instance)
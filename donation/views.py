@@ -8,6 +8,8 @@ import folium
 import json
 import logging
 
+from user.images import ingest_image
+from user.uploads import SharedUpload
 from .models import FoodDonation
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,12 @@ def food_donation_form(request):
             messages.error(request, "Please fill out all required fields")
             logger.warning("Form submission failed due to missing fields")
         else:
+            # only resize the upload once the form is known to be valid
+            images = (
+                ingest_image(SharedUpload(food_image).data, food_image.name)
+                if food_image
+                else {}
+            )
             # Save donation to database
             food_donation = FoodDonation(
                 food_name=food_name,
@@ -37,7 +45,9 @@ def food_donation_form(request):
                 category=category,
                 expiry_date=expiry_date,
                 location=location,
-                food_image=food_image,
+                food_image=images.get("full"),
+                food_image_medium=images.get("medium"),
+                food_image_thumbnail=images.get("thumbnail"),
             )
             food_donation.save()
             messages.success(
@@ -57,7 +67,7 @@ def ngo_list(request):
 def food_donation_list(request):
     donations = FoodDonation.objects.all()  # Fetch all food donation
     logger.debug("Fetched all food donations: %d items", len(donations))
-    return render(request, "donation/order_list.html", {"donation": donations})
+    return render(request, "donation/order_list.html", {"donations": donations})
 
 
 # Create the IndianFoodDeliverySystem class to manage the logic
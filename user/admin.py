@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FoodItem, FoodItemPurchase, DetectedObject
+from .models import FoodItem, FoodItemPurchase, DetectedObject, StoredBlob
 
 # Register your models here.
 admin.site.register(FoodItemPurchase)
@@ -8,5 +8,18 @@ admin.site.register(FoodItem)
 
 @admin.register(DetectedObject)
 class DetectedObjectAdmin(admin.ModelAdmin):
-    list_display = ("user", "name", "confidence", "detected_at")
+    list_display = (
+        "user",
+        "name",
+        "confidence",
+        "frame_count",
+        "first_seen",
+        "last_seen",
+    )
     search_fields = ("name", "user__username")
+
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ("name", "size", "refcount", "created_at")
+    search_fields = ("name", "sha256")
@@ -0,0 +1,76 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool shared by all batch detection requests."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DETECTION_BATCH_WORKERS,
+                    thread_name_prefix="detection-batch",
+                )
+    return _executor
+
+
+def decode_image(data):
+    import cv2
+    import numpy as np
+
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def read_video_frames(uploaded_file, every=15, max_frames=64):
+    """Samples every ``every``-th frame of an uploaded video file."""
+    import cv2
+
+    suffix = os.path.splitext(uploaded_file.name)[1] or ".mp4"
+    with tempfile.NamedTemporaryFile(suffix=suffix) as temp:
+        for chunk in uploaded_file.chunks():
+            temp.write(chunk)
+        temp.flush()
+
+        cap = cv2.VideoCapture(temp.name)
+        frames, index = [], 0
+        try:
+            while len(frames) < max_frames:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if index % every == 0:
+                    frames.append((f"{uploaded_file.name}#{index}", frame))
+                index += 1
+        finally:
+            cap.release()
+    return frames
+
+
+def detect_frames(detector, frames, batch_size=None):
+    """
+    Runs ``detector`` over ``frames`` in batches spread across the worker pool.
+
+    Returns one list of Detection per frame, in input order, and the elapsed time.
+    """
+    batch_size = batch_size or settings.DETECTION_BATCH_SIZE
+    batches = [frames[i : i + batch_size] for i in range(0, len(frames), batch_size)]
+
+    started = time.perf_counter()
+    results = []
+    for detections in get_executor().map(detector.predict, batches):
+        results.extend(detections)
+    return results, time.perf_counter() - started
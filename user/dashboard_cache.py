@@ -0,0 +1,87 @@
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+CACHE_PREFIX = "dashboard"
+
+
+def _version_key(user_id):
+    return f"{CACHE_PREFIX}:version:{user_id}"
+
+
+def invalidate(*user_ids):
+    """Marks the cached dashboards of these users as stale."""
+    now = time.time()
+    cache.set_many(
+        {_version_key(user_id): now for user_id in user_ids},
+        settings.DASHBOARD_CACHE_TTL,
+    )
+
+
+def version(user_id):
+    """
+    Unix time of the last change to the user's food items.
+
+    Starts at the first read when nothing is cached yet, which errs on the side
+    of a fresh response rather than a stale 304.
+    """
+    key = _version_key(user_id)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time(), settings.DASHBOARD_CACHE_TTL)
+        value = cache.get(key, time.time())
+    return value
+
+
+def last_modified(request, *args, **kwargs):
+    """
+    ``Last-Modified`` for the requesting user's dashboard.
+
+    Days-until-expiry and statuses change at midnight too, so the value is never
+    older than the start of the current day.
+    """
+    today = timezone.now().date()
+    midnight = datetime.combine(today, datetime.min.time(), tzinfo=dt_timezone.utc)
+    changed = datetime.fromtimestamp(version(request.user.id), tz=dt_timezone.utc)
+    return max(changed, midnight)
+
+
+def etag(request, *args, **kwargs):
+    """
+    Validator built from the payload key and the negotiated media type, so the
+    JSON and browsable API renderings get different tags; no body hashing.
+    """
+    variant = _variant(request)
+    variant.update(repr(getattr(request, "accepted_media_type", None)).encode())
+    return variant.hexdigest()
+
+
+def _variant(request):
+    parts = [
+        request.user.id,
+        version(request.user.id),
+        timezone.now().date(),
+        request.path,
+        sorted(request.GET.lists()),
+    ]
+    return hashlib.md5(repr(parts).encode())
+
+
+def get_or_build(request, build):
+    """
+    Returns the cached payload for this request, calling ``build()`` on a miss.
+
+    The key embeds the user's change version and today's date, so edits and the
+    day rollover both land on a new key; old entries simply expire.
+    """
+    key = f"{CACHE_PREFIX}:payload:{_variant(request).hexdigest()}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, settings.DASHBOARD_CACHE_TTL)
+    return payload
@@ -0,0 +1,351 @@
+import ast
+import gc
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+
+Detection = namedtuple("Detection", ["label", "confidence", "box"])
+
+
+def resident_memory_mb():
+    """Current resident set size of this process in MB, or None if unknown."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is the peak RSS, in KB on Linux and bytes on macOS
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:
+        return None
+
+
+class UltralyticsBackend:
+    """
+    Runs the PyTorch weights through ultralytics, as the app always has.
+
+    The ultralytics predictor keeps per-call state, so calls are serialised;
+    torch still spreads each batch over its own intra-op threads.
+    """
+
+    name = "ultralytics"
+
+    def __init__(self, weights, imgsz=640, device="cpu"):
+        self.weights = weights
+        self.imgsz = imgsz
+        self.device = device
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        from ultralytics import YOLO
+
+        self._model = YOLO(self.weights)
+        self._model.to(self.device)
+
+    def predict(self, frames):
+        """Detects objects in a batch of BGR frames, one list of Detection per frame."""
+        with self._lock:
+            results = self._model(list(frames), imgsz=self.imgsz, verbose=False)
+        return [self._parse(result) for result in results]
+
+    def __call__(self, frame):
+        return self.predict([frame])[0]
+
+    @staticmethod
+    def _parse(result):
+        detections = []
+        for box in result.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            label = result.names[int(box.cls[0].item())]
+            confidence = round(box.conf[0].item(), 2)
+            detections.append(Detection(label, confidence, (x1, y1, x2, y2)))
+        return detections
+
+
+class OnnxBackend:
+    """
+    Runs an exported ONNX model through ONNX Runtime on the CPU.
+
+    The ``.onnx`` file next to the weights is exported on first load if it is
+    missing. With ``quantize`` the exported graph is additionally converted to
+    dynamic INT8 weights. Pre- and post-processing mirror ultralytics
+    (letterbox, confidence 0.25, per-class NMS at IoU 0.7) so boxes match the
+    PyTorch path.
+    """
+
+    name = "onnx"
+    conf_threshold = 0.25
+    iou_threshold = 0.7
+
+    def __init__(self, weights, imgsz=640, quantize=False):
+        self.weights = weights
+        self.imgsz = imgsz
+        self.quantize = quantize
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.names = {}
+        self._session = None
+        self._input = None
+
+    @property
+    def fp32_path(self):
+        return f"{os.path.splitext(self.weights)[0]}-{self.imgsz}.onnx"
+
+    @property
+    def onnx_path(self):
+        if self.quantize:
+            return self.fp32_path.replace(".onnx", ".int8.onnx")
+        return self.fp32_path
+
+    def _export(self):
+        from ultralytics import YOLO
+
+        exported = YOLO(self.weights).export(
+            format="onnx", imgsz=self.imgsz, dynamic=True, simplify=True
+        )
+        os.replace(exported, self.fp32_path)
+
+    def load(self):
+        import onnxruntime as ort
+
+        if not os.path.exists(self.fp32_path):
+            self._export()
+        if self.quantize and not os.path.exists(self.onnx_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(
+                self.fp32_path, self.onnx_path, weight_type=QuantType.QUInt8
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            self.onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+        self._input = self._session.get_inputs()[0].name
+        metadata = self._session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata.get("names", "{}"))
+
+    def _letterbox(self, frame):
+        import cv2
+        import numpy as np
+
+        height, width = frame.shape[:2]
+        ratio = min(self.imgsz / height, self.imgsz / width)
+        new_w, new_h = round(width * ratio), round(height * ratio)
+        pad_x, pad_y = (self.imgsz - new_w) / 2, (self.imgsz - new_h) / 2
+
+        resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        top, left = round(pad_y - 0.1), round(pad_x - 0.1)
+        canvas = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        canvas[top : top + new_h, left : left + new_w] = resized
+        return canvas, ratio, (left, top)
+
+    def predict(self, frames):
+        """Detects objects in a batch of BGR frames, one list of Detection per frame."""
+        import numpy as np
+
+        letterboxed = [self._letterbox(frame) for frame in frames]
+        batch = np.stack([canvas[:, :, ::-1] for canvas, _, _ in letterboxed])
+        batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2), dtype=np.float32)
+        batch /= 255.0
+
+        outputs = self._session.run(None, {self._input: batch})[0]
+        return [
+            self._postprocess(output, ratio, pad, frame.shape[:2])
+            for output, (_, ratio, pad), frame in zip(outputs, letterboxed, frames)
+        ]
+
+    def __call__(self, frame):
+        return self.predict([frame])[0]
+
+    def _postprocess(self, output, ratio, pad, shape):
+        import cv2
+        import numpy as np
+
+        predictions = output.T  # (anchors, 4 + classes)
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences >= self.conf_threshold
+        if not keep.any():
+            return []
+        boxes = predictions[keep, :4].copy()
+        class_ids, confidences = class_ids[keep], confidences[keep]
+
+        # centre xywh in letterbox space -> corner xywh in frame space
+        boxes[:, 0] = (boxes[:, 0] - boxes[:, 2] / 2 - pad[0]) / ratio
+        boxes[:, 1] = (boxes[:, 1] - boxes[:, 3] / 2 - pad[1]) / ratio
+        boxes[:, 2:] /= ratio
+
+        indices = cv2.dnn.NMSBoxesBatched(
+            boxes.tolist(),
+            confidences.tolist(),
+            class_ids.tolist(),
+            self.conf_threshold,
+            self.iou_threshold,
+        )
+        height, width = shape
+        detections = []
+        for i in np.array(indices).flatten():
+            x, y, w, h = boxes[i]
+            x1, y1 = max(0, int(x)), max(0, int(y))
+            x2, y2 = min(width, int(x + w)), min(height, int(y + h))
+            label = self.names.get(int(class_ids[i]), str(class_ids[i]))
+            detections.append(
+                Detection(label, round(float(confidences[i]), 2), (x1, y1, x2, y2))
+            )
+        detections.sort(key=lambda detection: detection.confidence, reverse=True)
+        return detections
+
+
+BACKENDS = {
+    "ultralytics": lambda weights, imgsz: UltralyticsBackend(weights, imgsz),
+    "onnx": lambda weights, imgsz: OnnxBackend(weights, imgsz),
+    "onnx-int8": lambda weights, imgsz: OnnxBackend(weights, imgsz, quantize=True),
+}
+
+
+def create_backend(name, weights, imgsz=640):
+    try:
+        return BACKENDS[name](weights, imgsz)
+    except KeyError:
+        raise ValueError(
+            f"Unknown detection backend '{name}', expected one of {sorted(BACKENDS)}"
+        )
+
+
+def compare_detections(expected, actual, min_iou=0.5):
+    """
+    Matches another backend's detections against reference ones, per frame.
+
+    A reference box is reproduced by the unmatched detection of the same label
+    that overlaps it most, if the overlap is at least ``min_iou``. Returns the
+    box counts, the largest confidence difference of a match and the missed
+    ``(frame index, detection)`` pairs.
+    """
+    from .tracking import iou
+
+    total = matched = 0
+    worst_delta = 0.0
+    missed = []
+    for index, (ref_detections, detections) in enumerate(zip(expected, actual)):
+        unmatched = list(detections)
+        for ref in ref_detections:
+            total += 1
+            best = max(
+                (
+                    d
+                    for d in unmatched
+                    if d.label == ref.label and iou(d.box, ref.box) >= min_iou
+                ),
+                key=lambda d: iou(d.box, ref.box),
+                default=None,
+            )
+            if best is None:
+                missed.append((index, ref))
+                continue
+            unmatched.remove(best)
+            matched += 1
+            worst_delta = max(worst_delta, abs(best.confidence - ref.confidence))
+    return {
+        "total": total,
+        "matched": matched,
+        "match_rate": matched / total if total else 1.0,
+        "max_confidence_delta": worst_delta,
+        "missed": missed,
+    }
+
+
+class ModelProvider:
+    """
+    Loads a detection backend on first use instead of at import time.
+
+    ``preload()`` loads (and optionally warms up) the backend eagerly; call it
+    before the server forks its workers so they share the weights copy-on-write.
+    """
+
+    def __init__(self, backend, warmup=False):
+        self.backend = backend
+        self.warmup = warmup
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.memory_before_mb = None
+        self.memory_after_mb = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+                    self._loaded = True
+        return self.backend
+
+    def _load(self):
+        self.memory_before_mb = resident_memory_mb()
+        started = time.perf_counter()
+        self.backend.load()
+        self.load_seconds = time.perf_counter() - started
+
+        if self.warmup:
+            import numpy as np
+
+            started = time.perf_counter()
+            self.backend(np.zeros((480, 640, 3), dtype=np.uint8))
+            self.warmup_seconds = time.perf_counter() - started
+
+        self.memory_after_mb = resident_memory_mb()
+        logger.info(f"Loaded detection model: {self.stats()}")
+
+    def preload(self):
+        """Loads the model now and moves it out of the GC's reach before forking."""
+        backend = self.get()
+        # Objects created so far are never touched by the collector again, so the
+        # weights' pages stay shared between forked workers
+        gc.freeze()
+        return backend
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "weights": self.backend.weights,
+            "imgsz": self.backend.imgsz,
+            "loaded": self.loaded,
+            "load_ms": (
+                round(1000 * self.load_seconds, 1) if self.load_seconds else None
+            ),
+            "warmup_ms": (
+                round(1000 * self.warmup_seconds, 1) if self.warmup_seconds else None
+            ),
+            "rss_before_mb": self.memory_before_mb,
+            "rss_after_mb": self.memory_after_mb,
+        }
+
+
+yolo_provider = ModelProvider(
+    create_backend(
+        settings.DETECTION_BACKEND,
+        settings.DETECTION_MODEL_WEIGHTS,
+        settings.DETECTION_IMGSZ,
+    ),
+    warmup=settings.DETECTION_MODEL_WARMUP,
+)
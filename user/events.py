@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+RETRY_MS = 5000
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def _offer(queue, event):
+    """Queues an event; a listener that fell too far behind is told to resync."""
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(("resync", {}))
+
+
+class LocalEventBroker:
+    """
+    Fans events out to the SSE listeners of this process.
+
+    Enough for a single ASGI process with in-process extraction jobs; events
+    published by other processes (e.g. Celery workers) are not seen.
+    """
+
+    def __init__(self):
+        self._listeners = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, event_type, data):
+        with self._lock:
+            listeners = list(self._listeners.get(user_id, ()))
+        for loop, queue in listeners:
+            loop.call_soon_threadsafe(_offer, queue, (event_type, data))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        listener = (
+            asyncio.get_running_loop(),
+            asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE),
+        )
+        with self._lock:
+            self._listeners[user_id].add(listener)
+        try:
+            yield listener[1]
+        finally:
+            with self._lock:
+                self._listeners[user_id].discard(listener)
+                if not self._listeners[user_id]:
+                    del self._listeners[user_id]
+
+
+class RedisEventBroker:
+    """Redis pub/sub broker, so every web and worker process shares events."""
+
+    def __init__(self, url):
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    @staticmethod
+    def channel(user_id):
+        return f"events:user:{user_id}"
+
+    def publish(self, user_id, event_type, data):
+        message = json.dumps({"type": event_type, "data": data}, cls=DjangoJSONEncoder)
+        try:
+            self._client.publish(self.channel(user_id), message)
+        except self._errors as e:
+            logger.warning(f"Could not publish {event_type} for user {user_id}: {e}")
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        from redis import asyncio as aioredis
+
+        queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel(user_id))
+
+        async def pump():
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    event = json.loads(message["data"])
+                    _offer(queue, (event["type"], event["data"]))
+
+        reader = asyncio.create_task(pump())
+        try:
+            yield queue
+        finally:
+            reader.cancel()
+            await pubsub.aclose()
+            await client.aclose()
+
+
+def get_broker():
+    """Redis broker when ``EVENTS_REDIS_URL`` is set, otherwise in-process."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if settings.EVENTS_REDIS_URL:
+                    _broker = RedisEventBroker(settings.EVENTS_REDIS_URL)
+                else:
+                    _broker = LocalEventBroker()
+    return _broker
+
+
+def publish(user_id, event_type, data):
+    """Sends an event to the user's listeners once the transaction commits."""
+    transaction.on_commit(lambda: get_broker().publish(user_id, event_type, data))
+
+
+def item_event_data(item):
+    return {
+        "id": item.id,
+        "status": item.status,
+        "extraction_status": item.extraction_status,
+        "expiration_date": str(item.expiration_date),
+    }
+
+
+def format_event(event_type, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"event: {event_type}\ndata: {payload}\n\n"
+
+
+async def event_stream(user_id):
+    """
+    Server-sent events for one user until the client disconnects.
+
+    Sends a comment every ``EVENTS_KEEPALIVE`` seconds so proxies keep the
+    connection open while nothing changes.
+    """
+    yield f"retry: {RETRY_MS}\n\n"
+    async with get_broker().subscribe(user_id) as queue:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.EVENTS_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(*event)
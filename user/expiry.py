@@ -0,0 +1,209 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+
+from PIL import Image
+from dateutil import parser as date_parser
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+EXPIRY_PROMPT = (
+    "Extract the expiry date from this image. "
+    "Only return the date, e.g., '12th Jan 2024'"
+)
+
+CACHE_PREFIX = "expiry"
+PHASH_INDEX_KEY = f"{CACHE_PREFIX}:phash-index"
+PHASH_INDEX_SIZE = 500
+
+_genai = None
+
+
+def get_genai():
+    """Imports and configures the Gemini client on first use."""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _genai = genai
+    return _genai
+
+
+def gemini_model():
+    return get_genai().GenerativeModel("gemini-2.0-flash")
+
+
+class StaticExpiryModel:
+    """
+    Offline stand-in for Gemini, selected with ``EXPIRY_MODEL``.
+
+    Answers every request with ``EXPIRY_STATIC_DATE`` so tests and local setups
+    can run the upload flow without network access or an API key.
+    """
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, text=None):
+        self.text = text or settings.EXPIRY_STATIC_DATE
+        self.calls = 0
+
+    def generate_content(self, contents):
+        self.calls += 1
+        return self.Response(self.text)
+
+
+def get_expiry_model():
+    """Builds the model named by ``EXPIRY_MODEL`` (Gemini by default)."""
+    return import_string(settings.EXPIRY_MODEL)()
+
+
+class ExpiryCacheStats:
+    """Process-wide hit/miss counters for the expiry-date cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.model_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_hit(self, near=False):
+        with self._lock:
+            if near:
+                self.near_hits += 1
+            else:
+                self.hits += 1
+
+    def record_miss(self, seconds):
+        with self._lock:
+            self.misses += 1
+            self.model_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            average = self.model_seconds / self.misses if self.misses else 0.0
+            return {
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "avg_model_ms": round(1000 * average, 1),
+                # every exact hit saves roughly one average model round-trip
+                "saved_ms": round(1000 * average * self.hits, 1),
+            }
+
+
+cache_stats = ExpiryCacheStats()
+
+
+def read_image_bytes(image):
+    """Returns the raw bytes of a path, bytes object or (uploaded) file."""
+    if isinstance(image, bytes):
+        return image
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, "rb") as f:
+            return f.read()
+    if hasattr(image, "seek"):
+        image.seek(0)
+    data = image.read()
+    if hasattr(image, "seek"):
+        image.seek(0)
+    return data
+
+
+def difference_hash(picture, size=8):
+    """64-bit dHash: one bit per adjacent pixel pair of a tiny grey copy."""
+    small = picture.convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _find_near_duplicate(phash):
+    max_distance = settings.EXPIRY_CACHE_PHASH_DISTANCE
+    for other, digest in cache.get(PHASH_INDEX_KEY, []):
+        if bin(other ^ phash).count("1") <= max_distance:
+            return digest
+    return None
+
+
+def _remember_phash(phash, digest):
+    index = [entry for entry in cache.get(PHASH_INDEX_KEY, []) if entry[1] != digest]
+    index.insert(0, (phash, digest))
+    cache.set(PHASH_INDEX_KEY, index[:PHASH_INDEX_SIZE], settings.EXPIRY_CACHE_TTL)
+
+
+def parse_expiry_date(text):
+    """Parses free-form model output such as '12th Jan 2024' into a date."""
+    if not text:
+        return None
+    try:
+        return date_parser.parse(text, fuzzy=True, dayfirst=True).date()
+    except (ValueError, OverflowError):
+        logger.warning(f"Could not parse expiry date from {text!r}")
+        return None
+
+
+def extract_expiry_date_from_image(image, model=None):
+    """
+    Asks the vision model for the expiry date printed on ``image``.
+
+    Results are cached by SHA-256 of the image bytes so re-uploads of the same
+    photo skip the remote call. When ``EXPIRY_CACHE_PHASH_DISTANCE`` is set, the
+    date of a perceptually similar photo is only used if the model call fails:
+    a dHash can't see the printed date, so near-duplicates of one packaging
+    with different dates look the same. Returns None on failure.
+    """
+    try:
+        data = read_image_bytes(image)
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{CACHE_PREFIX}:sha256:{digest}"
+
+        cached = cache.get(key)
+        if cached is not None:
+            cache_stats.record_hit()
+            return cached
+
+        picture = Image.open(io.BytesIO(data))
+        phash = prefill = None
+        if settings.EXPIRY_CACHE_PHASH_DISTANCE:
+            phash = difference_hash(picture)
+            near = _find_near_duplicate(phash)
+            prefill = cache.get(f"{CACHE_PREFIX}:sha256:{near}") if near else None
+
+        model = model or get_expiry_model()
+        started = time.perf_counter()
+        try:
+            response = model.generate_content([EXPIRY_PROMPT, picture])
+        except Exception as e:
+            if prefill is None:
+                raise
+            logger.warning(f"Expiry model failed, using a similar photo's date: {e}")
+            cache_stats.record_hit(near=True)
+            return prefill
+        cache_stats.record_miss(time.perf_counter() - started)
+        expiry_date = response.text.strip()
+
+        cache.set(key, expiry_date, settings.EXPIRY_CACHE_TTL)
+        if phash is not None:
+            _remember_phash(phash, digest)
+        logger.debug(f"Expiry cache: {cache_stats.snapshot()}")
+        return expiry_date
+    except Exception as e:
+        logger.error(f"Error processing image: {e}")
+        return None
@@ -0,0 +1,105 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+# Longest edge, in pixels, of each stored size
+FULL_SIZE = 1600
+MEDIUM_SIZE = 800
+THUMBNAIL_SIZE = 200
+
+EXIF_ORIENTATION = 0x0112
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process pool for image decoding and re-encoding, which holds the GIL."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # forking a threaded server can copy locks held by other threads
+                # (detection, extraction); start workers from a clean process
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.IMAGE_INGEST_WORKERS, mp_context=context
+                )
+    return _executor
+
+
+def _encode(picture, format, **options):
+    buffer = io.BytesIO()
+    picture.save(buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+def build_variants(data):
+    """
+    Normalises one uploaded image and renders its smaller copies.
+
+    Runs inside a worker process. Returns ``{"full": (bytes, ext), "medium":
+    ..., "thumbnail": ...}``; the full image keeps the original bytes when it
+    is already upright and small enough, otherwise it is re-encoded as JPEG.
+    """
+    picture = Image.open(io.BytesIO(data))
+    rotated = picture.getexif().get(EXIF_ORIENTATION, 1) != 1
+    upright = ImageOps.exif_transpose(picture)
+    if upright.mode not in ("RGB", "L"):
+        upright = upright.convert("RGB")
+
+    if not rotated and max(picture.size) <= FULL_SIZE:
+        full = (data, (picture.format or "jpeg").lower())
+    else:
+        resized = upright.copy()
+        resized.thumbnail((FULL_SIZE, FULL_SIZE), Image.LANCZOS)
+        full = (_encode(resized, "JPEG", quality=85, optimize=True), "jpg")
+
+    variants = {"full": full}
+    for name, size, quality in (
+        ("medium", MEDIUM_SIZE, 80),
+        ("thumbnail", THUMBNAIL_SIZE, 70),
+    ):
+        resized = upright.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        variants[name] = (_encode(resized, "WEBP", quality=quality, method=4), "webp")
+    return variants
+
+
+def ingest_image(data, name):
+    """
+    Builds the full, medium and thumbnail files for an upload in the process pool.
+
+    Returns a dict of ``ContentFile`` objects ready to assign to image fields.
+    If the upload can't be decoded only the untouched ``full`` file is returned.
+    """
+    try:
+        variants = get_executor().submit(build_variants, data).result()
+    except Exception as e:
+        logger.warning(f"Could not build image variants for {name}: {e}")
+        return {"full": ContentFile(data, name=os.path.basename(name))}
+
+    base = os.path.splitext(os.path.basename(name))[0] or "image"
+    files = {}
+    for variant, (content, ext) in variants.items():
+        suffix = "" if variant == "full" else f"_{variant}"
+        files[variant] = ContentFile(content, name=f"{base}{suffix}.{ext}")
+    logger.debug(
+        f"Ingested {name}: "
+        + ", ".join(f"{variant}={len(f)}B" for variant, f in files.items())
+    )
+    return files
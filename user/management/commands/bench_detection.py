@@ -0,0 +1,163 @@
+import json
+import os
+import platform
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from user.detection import ModelProvider, create_backend
+from user.models import DetectedObject
+from user.sinks import DetectionSink
+from user.streaming import DetectionStream, MotionGate, ReplayCapture, StageStats
+from user.tracking import IoUTracker
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays a recorded video or a directory of frames through the video_feed "
+        "pipeline (capture, detection, drawing, JPEG encoding, DB writes) and "
+        "reports throughput and per-stage latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Video file or directory of frames")
+        parser.add_argument("--backend", default=settings.DETECTION_BACKEND)
+        parser.add_argument("--weights", default=settings.DETECTION_MODEL_WEIGHTS)
+        parser.add_argument("--imgsz", type=int, default=settings.DETECTION_IMGSZ)
+        parser.add_argument(
+            "--stride", type=int, default=settings.DETECTION_INFERENCE_STRIDE
+        )
+        parser.add_argument(
+            "--motion-threshold",
+            type=float,
+            default=settings.DETECTION_MOTION_THRESHOLD,
+            help="0 disables the motion gate",
+        )
+        parser.add_argument("--max-frames", type=int, default=None)
+        parser.add_argument(
+            "--no-pace",
+            action="store_true",
+            help="Read frames as fast as possible instead of at the recorded FPS",
+        )
+        parser.add_argument(
+            "--username",
+            default="bench",
+            help="User the DetectedObject rows are written for (created if missing)",
+        )
+        parser.add_argument(
+            "--keep-rows",
+            action="store_true",
+            help="Keep the DetectedObject rows written during the run",
+        )
+        parser.add_argument("--output", help="Write the JSON results to this file")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["source"]):
+            raise CommandError(f"{options['source']} does not exist")
+
+        provider = ModelProvider(
+            create_backend(options["backend"], options["weights"], options["imgsz"]),
+            warmup=True,
+        )
+        detector = provider.get()
+
+        user, _ = User.objects.get_or_create(username=options["username"])
+        last_id = (
+            DetectedObject.objects.order_by("-id").values_list("id", flat=True).first()
+            or 0
+        )
+
+        capture = ReplayCapture(
+            options["source"],
+            pace=not options["no_pace"],
+            max_frames=options["max_frames"],
+        )
+        sink = DetectionSink(
+            user,
+            batch_size=settings.DETECTION_SINK_BATCH_SIZE,
+            flush_interval=settings.DETECTION_SINK_FLUSH_INTERVAL,
+            tracker=IoUTracker(max_misses=settings.DETECTION_TRACK_MAX_MISSES),
+        )
+        stream = DetectionStream(
+            detector,
+            source=capture,
+            sink=sink,
+            # percentiles over the whole run, not the last few hundred frames
+            stats=StageStats(window=None),
+            stride=options["stride"],
+            motion_gate=(
+                MotionGate(threshold=options["motion_threshold"])
+                if options["motion_threshold"] > 0
+                else None
+            ),
+        )
+
+        started = time.perf_counter()
+        frames_sent = bytes_sent = 0
+        for chunk in stream.mjpeg():
+            frames_sent += 1
+            bytes_sent += len(chunk)
+        elapsed = time.perf_counter() - started
+        # stop() gives up joining after a few seconds; the final sink flush
+        # happens when the inference thread exits, so wait for it before counting
+        stream.join()
+
+        rows = DetectedObject.objects.filter(user=user, id__gt=last_id)
+        rows_written = rows.count()
+        if not options["keep_rows"]:
+            rows.delete()
+
+        stages = stream.stats.snapshot()
+        results = {
+            "revision": git_revision(),
+            "run_at": timezone.now().isoformat(),
+            "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+            "config": {
+                "source": options["source"],
+                "backend": options["backend"],
+                "weights": options["weights"],
+                "imgsz": options["imgsz"],
+                "stride": options["stride"],
+                "motion_threshold": options["motion_threshold"],
+                "paced": not options["no_pace"],
+            },
+            "model": provider.stats(),
+            "frames_captured": capture.frames_read,
+            "frames_streamed": frames_sent,
+            "frames_inferred": stages.get("infer", {}).get("count", 0),
+            "elapsed_s": round(elapsed, 3),
+            "stream_fps": round(frames_sent / elapsed, 2) if elapsed else 0,
+            "inference_fps": (
+                round(stages.get("infer", {}).get("count", 0) / elapsed, 2)
+                if elapsed
+                else 0
+            ),
+            "bytes_streamed": bytes_sent,
+            "stages": stages,
+            "db": dict(sink.counters(), rows_written=rows_written),
+        }
+
+        self.stdout.write(json.dumps(results, indent=2))
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f"Results written to {options['output']}")
+            )
@@ -0,0 +1,90 @@
+import glob
+import os
+import time
+
+import cv2
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.detection import compare_detections, create_backend
+
+FIXTURES = os.path.join(
+    settings.BASE_DIR, "user", "fixtures", "detection", "*.[jp][pn]g"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the reference ultralytics detector and another backend over a set "
+        "of fixture images and checks that they find the same objects."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", default="onnx")
+        parser.add_argument("--reference", default="ultralytics")
+        parser.add_argument("--weights", default=settings.DETECTION_MODEL_WEIGHTS)
+        parser.add_argument("--imgsz", type=int, default=settings.DETECTION_IMGSZ)
+        parser.add_argument(
+            "--images",
+            default=FIXTURES,
+            help="Glob of fixture images (defaults to user/fixtures/detection)",
+        )
+        parser.add_argument(
+            "--min-match",
+            type=float,
+            default=0.9,
+            help="Fraction of reference boxes the backend must reproduce",
+        )
+        parser.add_argument("--iou", type=float, default=0.5)
+        parser.add_argument("--max-confidence-delta", type=float, default=0.1)
+
+    def handle(self, *args, **options):
+        paths = sorted(glob.glob(options["images"]))
+        frames = [cv2.imread(path) for path in paths]
+        if not frames or any(frame is None for frame in frames):
+            raise CommandError(f"No readable images match {options['images']}")
+
+        reference = create_backend(
+            options["reference"], options["weights"], options["imgsz"]
+        )
+        candidate = create_backend(
+            options["backend"], options["weights"], options["imgsz"]
+        )
+        reference.load()
+        candidate.load()
+
+        expected, seconds_ref = self._run(reference, frames)
+        actual, seconds_candidate = self._run(candidate, frames)
+
+        parity = compare_detections(expected, actual, min_iou=options["iou"])
+        for index, ref in parity["missed"]:
+            self.stdout.write(f"  {os.path.basename(paths[index])}: missed {ref}")
+
+        match_rate = parity["match_rate"]
+        worst_delta = parity["max_confidence_delta"]
+        self.stdout.write(
+            f"{candidate.name} vs {reference.name} on {len(frames)} images: "
+            f"{parity['matched']}/{parity['total']} boxes matched ({match_rate:.0%}), "
+            f"max confidence delta {worst_delta:.2f}, "
+            f"{1000 * seconds_ref / len(frames):.1f} ms vs "
+            f"{1000 * seconds_candidate / len(frames):.1f} ms per image"
+        )
+
+        if match_rate < options["min_match"]:
+            raise CommandError(
+                f"Only {match_rate:.0%} of reference boxes matched "
+                f"(need {options['min_match']:.0%})"
+            )
+        if worst_delta > options["max_confidence_delta"]:
+            raise CommandError(
+                f"Confidence drifted by {worst_delta:.2f} "
+                f"(allowed {options['max_confidence_delta']:.2f})"
+            )
+        self.stdout.write(self.style.SUCCESS("Backends agree"))
+
+    @staticmethod
+    def _run(backend, frames):
+        backend(frames[0])  # warm-up, not timed
+        started = time.perf_counter()
+        detections = [backend(frame) for frame in frames]
+        return detections, time.perf_counter() - started
@@ -0,0 +1,75 @@
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from donation.models import FoodDonation
+from user import dashboard_cache
+from user.models import FoodItem, StoredBlob
+from user.storage import food_image_storage
+
+HASHED_NAME = re.compile(r"/[0-9a-f]{2}/[0-9a-f]{64}\.[^/]*$")
+
+IMAGE_FIELDS = [
+    (FoodItem, ["image", "image_medium", "image_thumbnail"]),
+    (FoodDonation, ["food_image", "food_image_medium", "food_image_thumbnail"]),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves food images saved before content-addressed storage onto hashed "
+        "names, so duplicate uploads share one file, and removes the old copies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        storage = food_image_storage()
+        legacy = FileSystemStorage(location=storage.location)
+        moved = freed_bytes = 0
+
+        for model, fields in IMAGE_FIELDS:
+            for field in fields:
+                names = (
+                    model.objects.exclude(**{field: ""})
+                    .exclude(**{f"{field}__isnull": True})
+                    .values_list(field, flat=True)
+                    .distinct()
+                )
+                for name in names:
+                    if HASHED_NAME.search(name) or not legacy.exists(name):
+                        continue
+                    rows = model.objects.filter(**{field: name})
+                    count = rows.count()
+                    if options["dry_run"]:
+                        self.stdout.write(f"Would move {name} ({count} rows)")
+                        continue
+
+                    with legacy.open(name, "rb") as content:
+                        new_name = storage.save(name, content)
+                    # storage.save took one reference; the other rows need theirs
+                    StoredBlob.objects.filter(name=new_name).update(
+                        refcount=F("refcount") + count - 1
+                    )
+                    # cached dashboards of these users still show the legacy name
+                    user_ids = []
+                    if model is FoodItem:
+                        user_ids = set(rows.values_list("user_id", flat=True))
+                    rows.update(**{field: new_name})
+                    dashboard_cache.invalidate(*user_ids)
+                    moved += 1
+
+                    if new_name != name:
+                        freed_bytes += legacy.size(name)
+                        legacy.delete(name)
+
+        blobs = StoredBlob.objects.filter(name__startswith="food_images/")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Moved {moved} files onto {blobs.count()} hashed files, "
+                f"freeing {freed_bytes / 1024:.0f} KB of legacy copies"
+            )
+        )
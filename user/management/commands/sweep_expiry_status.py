@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user.tasks import sweep_expiry_statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes FoodItem.status for every user whose items crossed the "
+        "fresh / expiring soon / expired boundary since the last sweep. Run it "
+        "from cron, or let celery beat run the user.sweep_expiry_statuses task."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.STATUS_SWEEP_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Check every row instead of only the windows crossed since last run",
+        )
+
+    def handle(self, *args, **options):
+        sweep = sweep_expiry_statuses(options["chunk_size"], full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Swept through {sweep.swept_through}: {sweep.rows_scanned} rows "
+                f"scanned, {sweep.rows_updated} updated in {sweep.duration_ms} ms"
+            )
+        )
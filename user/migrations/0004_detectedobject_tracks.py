@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_detectedobject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectedobject',
+            name='first_seen',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='detectedobject',
+            name='last_seen',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='detectedobject',
+            name='frame_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
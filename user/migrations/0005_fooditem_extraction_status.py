@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_detectedobject_tracks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooditem',
+            name='extraction_status',
+            field=models.CharField(choices=[('none', 'Not Requested'), ('pending', 'Pending Extraction'), ('done', 'Extracted'), ('failed', 'Extraction Failed')], default='none', max_length=20),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:20
+
+import user.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_fooditem_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='fooditem',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.food_image_storage, upload_to='food_images/'),
+        ),
+        migrations.AlterField(
+            model_name='fooditem',
+            name='image_medium',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.food_image_storage, upload_to='food_images/variants/'),
+        ),
+        migrations.AlterField(
+            model_name='fooditem',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.food_image_storage, upload_to='food_images/variants/'),
+        ),
+    ]
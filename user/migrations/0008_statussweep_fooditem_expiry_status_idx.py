@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_storedblob_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('swept_through', models.DateField()),
+                ('rows_scanned', models.PositiveIntegerField(default=0)),
+                ('rows_updated', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-ran_at'],
+                'get_latest_by': 'ran_at',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['expiration_date', 'status'], name='fooditem_expiry_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['updated_at'], name='fooditem_updated_idx'),
+        ),
+    ]
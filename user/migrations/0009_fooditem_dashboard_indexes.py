@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_statussweep_fooditem_expiry_status_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='fooditem_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['user', 'status', '-created_at'], name='fooditem_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['user', 'category', '-created_at'], name='fooditem_user_category_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0009_fooditem_dashboard_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(condition=models.Q(('status__in', ['used', 'donated']), _negated=True), fields=['user', 'expiration_date', 'id'], name='fooditem_user_active_exp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(condition=models.Q(('status__in', ['used', 'donated']), _negated=True), fields=['user', 'category', 'expiration_date', 'id'], name='fooditem_user_cat_exp_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_fooditem_active_expiry_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooditempurchase',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+    ]
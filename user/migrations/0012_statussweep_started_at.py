@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_fooditempurchase_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statussweep',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,8 +1,129 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 
+from . import dashboard_cache, events
+from .storage import food_image_storage
+
+
+# Items expiring within this many days are "expiring_soon"
+EXPIRING_SOON_DAYS = 2
+# Statuses set by the user that date-based recomputation must not overwrite
+FINAL_STATUSES = ["used", "donated"]
+
+
+def status_for_dates(today):
+    """SQL CASE giving the date-based status of a row as of ``today``."""
+    return models.Case(
+        models.When(expiration_date__lt=today, then=models.Value("expired")),
+        models.When(
+            expiration_date__lte=today + timedelta(days=EXPIRING_SOON_DAYS),
+            then=models.Value("expiring_soon"),
+        ),
+        default=models.Value("fresh"),
+        output_field=models.CharField(),
+    )
+
+
+def status_on(expiration_date, today):
+    """Python counterpart of ``status_for_dates`` for a single date."""
+    if expiration_date < today:
+        return "expired"
+    if expiration_date <= today + timedelta(days=EXPIRING_SOON_DAYS):
+        return "expiring_soon"
+    return "fresh"
+
+
+class FoodItemQuerySet(models.QuerySet):
+    def active(self):
+        """Items still in the fridge; matches the partial indexes' condition."""
+        return self.exclude(status__in=FINAL_STATUSES)
+
+    def expiring_first(self, today=None, category=None, include_expired=False):
+        """
+        Active items in the order they expire, soonest first.
+
+        Slicing the result is a range scan on the partial
+        ``(user, [category,] expiration_date)`` indexes.
+        """
+        items = self.active()
+        if not include_expired:
+            items = items.filter(expiration_date__gte=today or timezone.now().date())
+        if category:
+            items = items.filter(category=category)
+        return items.order_by("expiration_date", "id")
+
+    def status_counts(self, today=None):
+        """
+        Item counts per status bucket in one grouped query.
+
+        Active items are bucketed by their expiration date as of ``today`` rather
+        than the stored status, which may not have been swept yet.
+        """
+        today = today or timezone.now().date()
+        bucket = models.Case(
+            models.When(status__in=FINAL_STATUSES, then=models.F("status")),
+            default=status_for_dates(today),
+            output_field=models.CharField(),
+        )
+        counts = dict.fromkeys(dict(self.model.STATUS_CHOICES), 0)
+        rows = (
+            self.order_by()
+            .annotate(bucket=bucket)
+            .values("bucket")
+            .annotate(count=models.Count("id"))
+        )
+        for row in rows:
+            counts[row["bucket"]] = row["count"]
+        return counts
+
+    def with_current_status(self, today=None):
+        """Annotates ``current_status`` computed from the expiration date."""
+        today = today or timezone.now().date()
+        return self.annotate(current_status=status_for_dates(today))
+
+    def stale_status(self, today=None):
+        """Rows whose stored status no longer matches their expiration date."""
+        today = today or timezone.now().date()
+        soon = today + timedelta(days=EXPIRING_SOON_DAYS)
+        return self.exclude(status__in=FINAL_STATUSES).filter(
+            (Q(expiration_date__lt=today) & ~Q(status="expired"))
+            | (
+                Q(expiration_date__gte=today, expiration_date__lte=soon)
+                & ~Q(status="expiring_soon")
+            )
+            | (Q(expiration_date__gt=soon) & ~Q(status="fresh"))
+        )
+
+    def refresh_statuses(self, today=None):
+        """
+        Brings stored statuses up to date in a single UPDATE ... CASE.
+
+        Only rows whose status actually changes are written; returns their count.
+        Bulk updates skip ``post_save``, so the owners' dashboard caches are
+        invalidated and status events published here.
+        """
+        today = today or timezone.now().date()
+        stale = self.stale_status(today)
+        rows = list(stale.values_list("id", "user_id", "expiration_date"))
+        if not rows:
+            return 0
+        updated = stale.update(
+            status=status_for_dates(today), updated_at=timezone.now()
+        )
+        dashboard_cache.invalidate(*{user_id for _, user_id, _ in rows})
+        for item_id, user_id, expiration_date in rows:
+            events.publish(
+                user_id,
+                "item.status",
+                {"id": item_id, "status": status_on(expiration_date, today)},
+            )
+        return updated
+
 
 def default_expiration(category):
     """Sets default expiration date based on category."""
@@ -26,6 +147,12 @@ class FoodItem(models.Model):
         ("used", "Used"),
         ("donated", "Donated"),
     ]
+    EXTRACTION_CHOICES = [
+        ("none", "Not Requested"),
+        ("pending", "Pending Extraction"),
+        ("done", "Extracted"),
+        ("failed", "Extraction Failed"),
+    ]
 
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="food_items", default=1
@@ -33,15 +160,65 @@ class FoodItem(models.Model):
     name = models.CharField(max_length=100)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="fresh")
     expiration_date = models.DateField()
-    image = models.ImageField(upload_to="food_images/", blank=True, null=True)
+    image = models.ImageField(
+        upload_to="food_images/", storage=food_image_storage, blank=True, null=True
+    )
+    image_medium = models.ImageField(
+        upload_to="food_images/variants/",
+        storage=food_image_storage,
+        blank=True,
+        null=True,
+    )  # ~800px WebP copy of image
+    image_thumbnail = models.ImageField(
+        upload_to="food_images/variants/",
+        storage=food_image_storage,
+        blank=True,
+        null=True,
+    )  # ~200px WebP copy of image
     category = models.CharField(
         max_length=20, choices=CATEGORY_CHOICES, default="other"
     )
+    extraction_status = models.CharField(
+        max_length=20, choices=EXTRACTION_CHOICES, default="none"
+    )  # Background expiry-date extraction from the image
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = FoodItemQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # status sweeps look rows up by the date whose boundary was crossed
+            models.Index(
+                fields=["expiration_date", "status"], name="fooditem_expiry_status_idx"
+            ),
+            models.Index(fields=["updated_at"], name="fooditem_updated_idx"),
+            # dashboard_data pages through one user's items newest first,
+            # optionally narrowed to a status or category
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="fooditem_user_created_idx"
+            ),
+            models.Index(
+                fields=["user", "status", "-created_at"],
+                name="fooditem_user_status_idx",
+            ),
+            models.Index(
+                fields=["user", "category", "-created_at"],
+                name="fooditem_user_category_idx",
+            ),
+            # "eat first" lists only care about items that are still around
+            models.Index(
+                fields=["user", "expiration_date", "id"],
+                name="fooditem_user_active_exp_idx",
+                condition=~Q(status__in=FINAL_STATUSES),
+            ),
+            models.Index(
+                fields=["user", "category", "expiration_date", "id"],
+                name="fooditem_user_cat_exp_idx",
+                condition=~Q(status__in=FINAL_STATUSES),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.get_status_display()}"
@@ -115,6 +292,9 @@ class FoodItemPurchase(models.Model):
     wasted_quantity = models.PositiveIntegerField(
         default=0, blank=True, null=True
     )  # Food that was wasted
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0
+    )  # Price paid per unit
 
     class Meta:
         ordering = ["-year_bought", "-month_bought"]
@@ -134,22 +314,55 @@ class FoodItemPurchase(models.Model):
         super().clean()
 
     def calculate_wastage_cost(self):
-        if self.amount_wasted and self.price_per_unit:
-            return self.amount_wasted * self.price_per_unit
-        return 0
+        return (self.wasted_quantity or 0) * self.price
 
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
 
 
+class StatusSweep(models.Model):
+    """One run of the periodic expiry-status sweep."""
+
+    swept_through = models.DateField()  # Statuses are correct as of this day
+    rows_scanned = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    duration_ms = models.PositiveIntegerField(default=0)
+    # Rows edited after this are picked up by the next sweep
+    started_at = models.DateTimeField(null=True, blank=True)
+    ran_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-ran_at"]
+        get_latest_by = "ran_at"
+
+    def __str__(self):
+        return f"Sweep through {self.swept_through}: {self.rows_updated} updated"
+
+
 class DetectedObject(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="detected_objects"
     )
     name = models.CharField(max_length=100)
-    confidence = models.FloatField()
+    confidence = models.FloatField()  # Highest confidence seen for this track
     detected_at = models.DateTimeField(auto_now_add=True)
+    first_seen = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now)
+    frame_count = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return f"{self.name} detected with {self.confidence * 100:.2f}% confidence"
+
+
+class StoredBlob(models.Model):
+    """Reference count for a content-addressed file in media storage."""
+
+    name = models.CharField(max_length=255, unique=True)  # Path in storage
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} references)"
@@ -0,0 +1,16 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class FoodItemCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a user's food items, newest first.
+
+    Each page is a ``WHERE created_at < <cursor>`` range scan on the
+    ``(user, created_at)`` index, so page 100 costs the same as page 1.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = settings.DASHBOARD_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.DASHBOARD_MAX_PAGE_SIZE
@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import FoodItem, DetectedObject
 
@@ -13,6 +14,8 @@ class FoodItemSerializer(serializers.ModelSerializer):
             "status",
             "expiration_date",
             "image",
+            "image_medium",
+            "image_thumbnail",
             "category",
             "created_at",
             "updated_at",
@@ -26,5 +29,120 @@ class FoodItemSerializer(serializers.ModelSerializer):
 class DetectedObjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = DetectedObject
-        fields = ["id", "name", "confidence", "timestamp", "user"]
-        read_only_fields = ["id", "timestamp", "user"]
+        fields = [
+            "id",
+            "name",
+            "confidence",
+            "detected_at",
+            "first_seen",
+            "last_seen",
+            "frame_count",
+            "user",
+        ]
+        read_only_fields = ["id", "detected_at", "user"]
+
+
+# Read-only fast path for list endpoints. These build the same dicts as the
+# serializers above straight from ``.values()`` rows, skipping per-field
+# serializer machinery; keep the formatting in step with DRF's fields.
+
+
+def _date(value):
+    return value.isoformat() if value is not None else None
+
+
+def _datetime(value):
+    """DRF's ISO 8601 DateTimeField output in the current time zone."""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def _image_url(field_name):
+    storage = FoodItem._meta.get_field(field_name).storage
+    return lambda name: storage.url(name) if name else None
+
+
+FOOD_ITEM_COLUMNS = {
+    "id": ("id", None),
+    "name": ("name", None),
+    "status": ("status", None),
+    "expiration_date": ("expiration_date", _date),
+    "image": ("image", _image_url("image")),
+    "image_medium": ("image_medium", _image_url("image_medium")),
+    "image_thumbnail": ("image_thumbnail", _image_url("image_thumbnail")),
+    "category": ("category", None),
+    "created_at": ("created_at", _datetime),
+    "updated_at": ("updated_at", _datetime),
+}
+
+
+def food_item_values(queryset, fields=None):
+    """
+    ``.values()`` query for ``render_food_items``.
+
+    Always includes ``id`` and ``created_at`` so cursor pagination still works.
+    """
+    fields = fields or FoodItemSerializer.Meta.fields
+    columns = {"id", "created_at"}
+    for field in fields:
+        if field == "days_until_expiry":
+            columns.add("expiration_date")
+        else:
+            columns.add(FOOD_ITEM_COLUMNS[field][0])
+    return queryset.values(*sorted(columns))
+
+
+def render_food_items(rows, fields=None, today=None):
+    """Same output as ``FoodItemSerializer(many=True).data``, limited to ``fields``."""
+    today = today or timezone.now().date()
+    fields = [
+        field
+        for field in FoodItemSerializer.Meta.fields
+        if not fields or field in fields
+    ]
+    items = []
+    for row in rows:
+        item = {}
+        for field in fields:
+            if field == "days_until_expiry":
+                expires = row["expiration_date"]
+                item[field] = (expires - today).days if expires else None
+            else:
+                column, convert = FOOD_ITEM_COLUMNS[field]
+                value = row[column]
+                item[field] = convert(value) if convert else value
+        items.append(item)
+    return items
+
+
+DETECTED_OBJECT_COLUMNS = [
+    "id",
+    "name",
+    "confidence",
+    "detected_at",
+    "first_seen",
+    "last_seen",
+    "frame_count",
+    "user_id",
+]
+
+
+def render_detected_objects(rows):
+    """Same output as ``DetectedObjectSerializer(many=True).data``."""
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "confidence": float(row["confidence"]),
+            "detected_at": _datetime(row["detected_at"]),
+            "first_seen": _datetime(row["first_seen"]),
+            "last_seen": _datetime(row["last_seen"]),
+            "frame_count": row["frame_count"],
+            "user": row["user_id"],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from . import dashboard_cache, events
+from .models import FoodItem
+from .storage import release_files, release_replaced_files, remember_files
+
+IMAGE_FIELDS = ["image", "image_medium", "image_thumbnail"]
+
+
+@receiver(post_delete, sender=FoodItem)
+def release_food_item_images(sender, instance, **kwargs):
+    release_files(instance, *IMAGE_FIELDS)
+
+
+@receiver(pre_save, sender=FoodItem)
+def remember_food_item_images(sender, instance, update_fields=None, **kwargs):
+    remember_files(instance, *IMAGE_FIELDS, update_fields=update_fields)
+
+
+@receiver(post_save, sender=FoodItem)
+def release_replaced_food_item_images(sender, instance, **kwargs):
+    release_replaced_files(instance)
+
+
+@receiver(post_save, sender=FoodItem)
+@receiver(post_delete, sender=FoodItem)
+def invalidate_dashboard(sender, instance, **kwargs):
+    dashboard_cache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=FoodItem)
+def publish_item_saved(sender, instance, created, **kwargs):
+    event_type = "item.created" if created else "item.updated"
+    events.publish(instance.user_id, event_type, events.item_event_data(instance))
+
+
+@receiver(post_delete, sender=FoodItem)
+def publish_item_deleted(sender, instance, **kwargs):
+    events.publish(instance.user_id, "item.deleted", {"id": instance.id})
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+
+from django.utils import timezone
+
+from .models import DetectedObject
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+
+class DetectionSink:
+    """
+    Buffers detections from the video stream and writes them with bulk_create.
+
+    The buffer is flushed once it holds ``batch_size`` rows or its oldest row is
+    older than ``flush_interval`` seconds, and always when the sink is closed.
+
+    With a ``tracker`` each frame is associated with the open tracks first and
+    only finished tracks are buffered, one row per physical object.
+    """
+
+    def __init__(self, user, batch_size=100, flush_interval=2.0, tracker=None):
+        self.user = user
+        self.tracker = tracker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.rows_buffered = 0
+        self.rows_flushed = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def _track_rows(self, tracks):
+        return [
+            DetectedObject(
+                user=self.user,
+                name=track.label,
+                confidence=track.max_confidence,
+                first_seen=track.first_seen,
+                last_seen=track.last_seen,
+                frame_count=track.frame_count,
+            )
+            for track in tracks
+        ]
+
+    def _buffer_rows(self, rows):
+        with self._lock:
+            if rows:
+                if not self._buffer:
+                    self._oldest = time.monotonic()
+                self._buffer.extend(rows)
+                self.rows_buffered += len(rows)
+            due = bool(self._buffer) and (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def add(self, frame_id, detections):
+        """Queues one frame's detections, flushing if a threshold was reached."""
+        if self.tracker is not None:
+            rows = self._track_rows(self.tracker.update(detections))
+        else:
+            now = timezone.now()
+            rows = [
+                DetectedObject(
+                    user=self.user,
+                    name=detection.label,
+                    confidence=detection.confidence,
+                    first_seen=now,
+                    last_seen=now,
+                )
+                for detection in detections
+            ]
+        self._buffer_rows(rows)
+
+    def flush_if_due(self):
+        """
+        Flushes rows that have waited ``flush_interval``; call it periodically,
+        since ``add()`` may not run while nothing moves in front of the camera.
+        """
+        self._buffer_rows([])
+
+    def flush(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._oldest = None
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            DetectedObject.objects.bulk_create(rows, batch_size=self.batch_size)
+        except Exception as e:
+            logger.error(f"Error flushing {len(rows)} detections: {e}", exc_info=True)
+            return 0
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.rows_flushed += len(rows)
+            self.flushes += 1
+            self.flush_seconds += elapsed
+            self.last_flush_seconds = elapsed
+        return len(rows)
+
+    def close(self):
+        if self.tracker is not None:
+            self._buffer_rows(self._track_rows(self.tracker.flush()))
+        self.flush()
+        logger.info(f"Detection sink closed: {self.counters()}")
+
+    def counters(self):
+        with self._lock:
+            return {
+                "rows_buffered": self.rows_buffered,
+                "rows_flushed": self.rows_flushed,
+                "rows_pending": len(self._buffer),
+                "flushes": self.flushes,
+                "flush_avg_ms": round(
+                    1000 * self.flush_seconds / self.flushes if self.flushes else 0, 2
+                ),
+                "last_flush_ms": round(1000 * self.last_flush_seconds, 2),
+            }
@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import os
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names files by the SHA-256 of their bytes.
+
+    ``food_images/apple.jpeg`` is stored as ``food_images/ab/ab12...ef.jpeg``,
+    so identical uploads share one file and saving a repeat upload only bumps
+    its ``StoredBlob`` reference count. ``delete()`` drops a reference and only
+    removes the file once nothing refers to it.
+    """
+
+    @staticmethod
+    def _blobs():
+        return apps.get_model("user", "StoredBlob").objects
+
+    @staticmethod
+    def hashed_name(name, digest):
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, digest[:2], f"{digest}{ext}").replace("\\", "/")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        sha256 = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks():
+            sha256.update(chunk)
+            size += len(chunk)
+        name = self.hashed_name(name, sha256.hexdigest())
+
+        # the row lock orders this against delete() of the same blob, which
+        # removes the file before releasing it
+        with transaction.atomic():
+            blob, _ = (
+                self._blobs()
+                .select_for_update()
+                .get_or_create(
+                    name=name, defaults={"sha256": sha256.hexdigest(), "size": size}
+                )
+            )
+            if not self.exists(name):
+                saved = self._save(name, content)
+                if saved != name:
+                    # an identical upload won the race to write this file
+                    super().delete(saved)
+            self._blobs().filter(pk=blob.pk).update(refcount=F("refcount") + 1)
+        return name
+
+    def delete(self, name):
+        """Drops one reference to ``name``; the file goes with the last one."""
+        if not name:
+            return
+        with transaction.atomic():
+            blob = self._blobs().select_for_update().filter(name=name).first()
+            if blob is None:
+                # a file stored before content addressing; nothing else shares it
+                return super().delete(name)
+            if blob.refcount > 1:
+                self._blobs().filter(pk=blob.pk).update(refcount=F("refcount") - 1)
+                return
+            blob.delete()
+            # still under the row lock, so a concurrent save() waits and rewrites it
+            super().delete(name)
+        logger.debug(f"Removed unreferenced media file {name}")
+
+
+def food_image_storage():
+    """Storage for every ``food_images/`` field; callable so migrations stay stable."""
+    return _food_image_storage
+
+
+_food_image_storage = ContentAddressedStorage()
+
+
+def remember_files(instance, *field_names, update_fields=None):
+    """
+    Notes the stored files a pending save may replace (call from ``pre_save``).
+
+    A field counts when its name changes or a new upload is about to be stored,
+    since an identical re-upload takes a fresh reference under the same name.
+    """
+    if update_fields is not None:
+        field_names = [name for name in field_names if name in update_fields]
+    stored = None
+    if instance.pk and field_names:
+        stored = type(instance)._base_manager.filter(pk=instance.pk)
+        stored = stored.values(*field_names).first()
+    instance._replaced_files = {}
+    for field_name in field_names:
+        old = (stored or {}).get(field_name)
+        field_file = getattr(instance, field_name)
+        if old and (old != field_file.name or not field_file._committed):
+            instance._replaced_files[field_name] = old
+
+
+def release_replaced_files(instance):
+    """Drops the references noted by ``remember_files`` (call from ``post_save``)."""
+    for field_name, name in getattr(instance, "_replaced_files", {}).items():
+        instance._meta.get_field(field_name).storage.delete(name)
+    instance._replaced_files = {}
+
+
+def release_files(instance, *field_names):
+    """Drops the storage references held by ``instance``'s file fields."""
+    for field_name in field_names:
+        field_file = getattr(instance, field_name)
+        if field_file:
+            field_file.storage.delete(field_file.name)
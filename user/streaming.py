@@ -0,0 +1,436 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+from django.db import connection
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 480
+FRAME_RATE = 15
+
+# How often (in seconds) the per-stage latency summary is logged
+STATS_LOG_INTERVAL = 10.0
+
+BOUNDARY = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+
+
+class StageStats:
+    """
+    Rolling latency samples (in seconds) for each pipeline stage.
+
+    Percentiles cover the last ``window`` samples; ``window=None`` keeps all.
+    """
+
+    def __init__(self, window=300):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.setdefault(stage, deque(maxlen=self.window))
+            samples.append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self):
+        """Returns count, fps and p50/p95/avg latency in milliseconds per stage."""
+        elapsed = max(time.perf_counter() - self.started_at, 1e-9)
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+            counts = dict(self._counts)
+
+        report = {}
+        for name, count in counts.items():
+            values = samples.get(name)
+            entry = {"count": count, "fps": round(count / elapsed, 2)}
+            if values:
+                entry.update(
+                    {
+                        "avg_ms": round(1000 * sum(values) / len(values), 2),
+                        "p50_ms": round(1000 * percentile(values, 50), 2),
+                        "p95_ms": round(1000 * percentile(values, 95), 2),
+                    }
+                )
+            report[name] = entry
+        return report
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+class LatestFrameQueue:
+    """Bounded queue that drops the oldest entries instead of blocking the producer."""
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Returns the oldest queued item, or None if nothing arrived in time."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+
+class MotionGate:
+    """
+    Cheap frame-difference check used to skip inference on an unchanged scene.
+
+    Frames are shrunk to a small blurred grayscale thumbnail and compared with the
+    thumbnail of the last frame that was actually sent to the model. The scene
+    counts as changed when more than ``threshold`` of the pixels moved by more
+    than ``pixel_delta`` grey levels.
+    """
+
+    def __init__(self, threshold=0.02, pixel_delta=25, size=(64, 48)):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self._reference = None
+
+    def _thumbnail(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def changed(self, frame):
+        """Returns True when the frame differs enough from the last accepted one."""
+        thumbnail = self._thumbnail(frame)
+        if self._reference is None or self.threshold <= 0:
+            self._reference = thumbnail
+            return True
+
+        diff = cv2.absdiff(thumbnail, self._reference)
+        moved = cv2.countNonZero(
+            cv2.threshold(diff, self.pixel_delta, 255, cv2.THRESH_BINARY)[1]
+        )
+        if moved / diff.size > self.threshold:
+            self._reference = thumbnail
+            return True
+        return False
+
+
+def draw_detections(frame, detections):
+    for detection in detections:
+        x1, y1, x2, y2 = detection.box
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    return frame
+
+
+class ReplayCapture:
+    """
+    ``cv2.VideoCapture`` stand-in that replays a video file or a directory of frames.
+
+    With ``pace`` frames are released at the recorded frame rate (or
+    ``FRAME_RATE`` for image directories) like a live camera would; otherwise
+    they are read as fast as possible.
+    """
+
+    IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+    def __init__(self, path, pace=True, max_frames=None):
+        self.path = path
+        self.pace = pace
+        self.max_frames = max_frames
+        self.frames_read = 0
+        self._cap = None
+        self._files = None
+        self.fps = FRAME_RATE
+
+        if os.path.isdir(path):
+            self._files = sorted(
+                os.path.join(path, name)
+                for name in os.listdir(path)
+                if name.lower().endswith(self.IMAGE_EXTENSIONS)
+            )
+        else:
+            self._cap = cv2.VideoCapture(path)
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or FRAME_RATE
+        self._next_at = None
+
+    def isOpened(self):
+        if self._files is not None:
+            return self.frames_read < len(self._files)
+        return self._cap.isOpened()
+
+    def set(self, prop, value):
+        return False  # recorded sources keep their own resolution and rate
+
+    def read(self):
+        if self.max_frames is not None and self.frames_read >= self.max_frames:
+            return False, None
+        if self.pace:
+            now = time.perf_counter()
+            if self._next_at is not None and self._next_at > now:
+                time.sleep(self._next_at - now)
+            self._next_at = max(now, self._next_at or now) + 1.0 / self.fps
+
+        if self._files is not None:
+            if self.frames_read >= len(self._files):
+                return False, None
+            frame = cv2.imread(self._files[self.frames_read])
+            ret = frame is not None
+        else:
+            ret, frame = self._cap.read()
+        if ret:
+            self.frames_read += 1
+        return ret, frame
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+
+
+class DetectionStream:
+    """
+    Camera capture, YOLO inference and MJPEG encoding decoupled onto separate threads.
+
+    The capture thread keeps the newest frame for display and pushes it into a
+    single-slot queue for the inference worker, so stale frames are dropped rather
+    than queued. The streaming generator always encodes the newest frame with the
+    most recent boxes, making displayed FPS independent of inference FPS.
+
+    The worker only runs the model on every ``stride``-th frame and, when a
+    ``motion_gate`` is given, only when the scene changed; skipped frames keep
+    showing the last detection result. Detections are handed to ``sink``; the
+    worker also lets it flush by time while frames are skipped, and closes it
+    when the stream ends.
+    """
+
+    def __init__(
+        self,
+        detector,
+        source=0,
+        sink=None,
+        stats=None,
+        stride=1,
+        motion_gate=None,
+    ):
+        self.detector = detector
+        self.source = source
+        self.sink = sink
+        self.stats = stats or StageStats()
+        self.stride = max(1, stride)
+        self.motion_gate = motion_gate
+
+        self._inference_queue = LatestFrameQueue(maxsize=1)
+        self._frame_cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._detections = []
+        self._detections_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._cap = None
+        self._listeners = []
+
+    def start(self):
+        # ``source`` is a camera index / URL, or an already opened capture
+        if hasattr(self.source, "read"):
+            self._cap = self.source
+        else:
+            self._cap = cv2.VideoCapture(self.source)
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+        self._cap.set(cv2.CAP_PROP_FPS, FRAME_RATE)
+
+        for target, name in (
+            (self._capture_loop, "detection-capture"),
+            (self._inference_loop, "detection-inference"),
+        ):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self._cap is not None:
+            self._cap.release()
+        logger.info(f"Detection stream stopped: {self.stats.snapshot()}")
+
+    def join(self, timeout=None):
+        """Waits for the capture and inference threads (and the sink) to finish."""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def latest_detections(self):
+        with self._detections_lock:
+            return list(self._detections)
+
+    def _capture_loop(self):
+        try:
+            while self.running and self._cap.isOpened():
+                started = time.perf_counter()
+                ret, frame = self._cap.read()
+                if not ret:
+                    break
+                self.stats.record("capture", time.perf_counter() - started)
+
+                with self._frame_cond:
+                    self._frame_id += 1
+                    self._frame = frame
+                    self._frame_cond.notify_all()
+                self._notify_listeners()
+                self._inference_queue.put((self._frame_id, frame))
+        finally:
+            self._stop.set()
+            with self._frame_cond:
+                self._frame_cond.notify_all()
+            self._notify_listeners()
+
+    def _notify_listeners(self):
+        for loop, event in self._listeners:
+            loop.call_soon_threadsafe(event.set)
+
+    def _should_infer(self, frame_id, frame, last_inferred_id):
+        if last_inferred_id and frame_id - last_inferred_id < self.stride:
+            self.stats.incr("skipped_stride")
+            return False
+        if self.motion_gate is not None:
+            started = time.perf_counter()
+            changed = self.motion_gate.changed(frame)
+            self.stats.record("motion", time.perf_counter() - started)
+            if not changed:
+                self.stats.incr("skipped_motion")
+                return False
+        return True
+
+    def _inference_loop(self):
+        last_inferred_id = 0
+        try:
+            while self.running:
+                item = self._inference_queue.get(timeout=0.5)
+                if self.sink is not None:
+                    # the motion gate can keep add() from running for a long time
+                    self.sink.flush_if_due()
+                if item is None:
+                    continue
+                frame_id, frame = item
+                if not self._should_infer(frame_id, frame, last_inferred_id):
+                    continue
+                last_inferred_id = frame_id
+
+                started = time.perf_counter()
+                detections = self.detector(frame)
+                self.stats.record("infer", time.perf_counter() - started)
+
+                with self._detections_lock:
+                    self._detections = detections
+                if self.sink is not None:
+                    self.sink.add(frame_id, detections)
+        except Exception as e:
+            logger.error(f"Error in detection worker: {e}", exc_info=True)
+            self._stop.set()
+        finally:
+            self.stats.incr("dropped", self._inference_queue.dropped)
+            if self.sink is not None:
+                self.sink.close()
+            # the worker thread opened its own DB connection through the sink
+            connection.close()
+
+    def _wait_for_frame(self, last_id):
+        with self._frame_cond:
+            while self.running and self._frame_id == last_id:
+                self._frame_cond.wait(timeout=1.0)
+            return self._frame_id, self._frame
+
+    def mjpeg(self):
+        """Yields multipart JPEG chunks until the camera stops or the client leaves."""
+        self.start()
+        last_id = 0
+        last_log = time.perf_counter()
+        try:
+            while True:
+                frame_id, frame = self._wait_for_frame(last_id)
+                if frame is None or frame_id == last_id:
+                    break
+                last_id = frame_id
+
+                yield self._encode(frame)
+
+                if time.perf_counter() - last_log >= STATS_LOG_INTERVAL:
+                    last_log = time.perf_counter()
+                    logger.info(f"Detection stream latency: {self.stats.snapshot()}")
+        finally:
+            self.stop()
+
+    def _encode(self, frame):
+        started = time.perf_counter()
+        output = draw_detections(frame.copy(), self.latest_detections())
+        _, jpeg = cv2.imencode(".jpg", output)
+        self.stats.record("encode", time.perf_counter() - started)
+        return BOUNDARY + jpeg.tobytes() + b"\r\n\r\n"
+
+    async def amjpeg(self, executor=None):
+        """
+        Async variant of ``mjpeg()`` for ASGI servers.
+
+        The event loop is woken by the capture thread instead of a thread blocking
+        on each frame; opening the camera, JPEG encoding and shutdown run in
+        ``executor`` so a viewer never holds a thread between frames.
+        """
+        loop = asyncio.get_running_loop()
+        new_frame = asyncio.Event()
+        self._listeners.append((loop, new_frame))
+        await loop.run_in_executor(executor, self.start)
+
+        last_id = 0
+        last_log = time.perf_counter()
+        try:
+            while True:
+                await new_frame.wait()
+                new_frame.clear()
+                with self._frame_cond:
+                    frame_id, frame = self._frame_id, self._frame
+                if frame is None or frame_id == last_id:
+                    if not self.running:
+                        break
+                    continue
+                last_id = frame_id
+
+                yield await loop.run_in_executor(executor, self._encode, frame)
+
+                if time.perf_counter() - last_log >= STATS_LOG_INTERVAL:
+                    last_log = time.perf_counter()
+                    logger.info(f"Detection stream latency: {self.stats.snapshot()}")
+        finally:
+            await loop.run_in_executor(executor, self.stop)
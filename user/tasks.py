@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from RefrigeratorStorageOptimizer import celery_app
+from . import dashboard_cache, events
+from .expiry import extract_expiry_date_from_image, parse_expiry_date
+from .models import (
+    EXPIRING_SOON_DAYS,
+    FINAL_STATUSES,
+    FoodItem,
+    StatusSweep,
+    status_on,
+)
+
+
+# set up logging for debuggind
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def extract_expiry_job(item_id, image_data=None):
+    """
+    Asks the model for the expiry date on the item's image and stores it.
+
+    ``image_data`` lets in-process jobs reuse the upload's bytes; otherwise the
+    image is read back from storage.
+    """
+    try:
+        item = FoodItem.objects.get(pk=item_id)
+    except FoodItem.DoesNotExist:
+        logger.warning(f"Expiry extraction skipped, food item {item_id} is gone")
+        return None
+
+    expiry_date = None
+    if image_data is not None:
+        expiry_date = parse_expiry_date(extract_expiry_date_from_image(image_data))
+    elif item.image_medium or item.image:
+        # prefer the downsized copy: fewer bytes to upload and a faster model call
+        with (item.image_medium or item.image).open("rb") as image:
+            expiry_date = parse_expiry_date(extract_expiry_date_from_image(image))
+
+    # the model call is slow; the user may have edited or used the item meanwhile
+    try:
+        item.refresh_from_db(fields=["status", "expiration_date"])
+    except FoodItem.DoesNotExist:
+        logger.warning(f"Food item {item_id} was deleted during expiry extraction")
+        return None
+
+    update_fields = ["extraction_status", "updated_at"]
+    if expiry_date:
+        item.expiration_date = expiry_date
+        item.extraction_status = "done"
+        update_fields.append("expiration_date")
+    else:
+        item.extraction_status = "failed"
+    if item.status not in FINAL_STATUSES:
+        item.status = status_on(item.expiration_date, timezone.now().date())
+        update_fields.append("status")
+    item.save(update_fields=update_fields)
+    logger.info(f"Expiry extraction for {item_id}: {item.extraction_status}")
+    return item.extraction_status
+
+
+def get_executor():
+    """In-process pool used when no Celery broker is configured."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.EXPIRY_EXTRACTION_WORKERS,
+                    thread_name_prefix="expiry-extraction",
+                )
+    return _executor
+
+
+def run_expiry_extraction(item_id, image_data=None):
+    """``extract_expiry_job`` that marks the item failed instead of raising."""
+    try:
+        return extract_expiry_job(item_id, image_data)
+    except Exception as e:
+        logger.error(f"Expiry extraction for {item_id} failed: {e}", exc_info=True)
+        items = FoodItem.objects.filter(pk=item_id)
+        items.update(extraction_status="failed")
+        for user_id in items.values_list("user_id", flat=True):
+            dashboard_cache.invalidate(user_id)
+            events.publish(
+                user_id,
+                "item.updated",
+                {"id": item_id, "extraction_status": "failed"},
+            )
+        return "failed"
+
+
+if celery_app is not None:
+    extract_expiry_task = celery_app.task(name="user.extract_expiry")(
+        run_expiry_extraction
+    )
+
+
+def _run_in_process(item_id, image_data):
+    try:
+        run_expiry_extraction(item_id, image_data)
+    finally:
+        close_old_connections()
+
+
+def enqueue_expiry_extraction(item_id, image_data=None):
+    """Schedules extraction once the current transaction has committed."""
+
+    def dispatch():
+        if celery_app is not None and settings.CELERY_BROKER_URL:
+            # don't ship image bytes through the broker; the worker reads storage
+            extract_expiry_task.delay(item_id)
+        else:
+            get_executor().submit(_run_in_process, item_id, image_data)
+
+    transaction.on_commit(dispatch)
+
+
+def sweep_expiry_statuses(chunk_size=1000, today=None, full=False):
+    """
+    Moves every user's items across the fresh / expiring_soon / expired boundaries.
+
+    After the first run only items whose expiration date lies in a window
+    crossed since the previous sweep (or that changed since it) are looked at,
+    via the (expiration_date, status) and updated_at indexes. They are updated
+    in primary-key chunks of ``chunk_size`` with one UPDATE ... CASE each.
+    """
+    started = time.perf_counter()
+    started_at = timezone.now()
+    today = today or started_at.date()
+    last = StatusSweep.objects.order_by("-swept_through", "-ran_at").first()
+
+    candidates = FoodItem.objects.stale_status(today)
+    if last is not None and not full:
+        # later runs on the same day find the date windows empty, but still pick
+        # up items created or edited since the previous run started
+        soon = timedelta(days=EXPIRING_SOON_DAYS)
+        candidates = candidates.filter(
+            # became expired since the last sweep
+            Q(expiration_date__gte=last.swept_through, expiration_date__lt=today)
+            # or came within the expiring-soon window since then
+            | Q(
+                expiration_date__gt=last.swept_through + soon,
+                expiration_date__lte=today + soon,
+            )
+            # or was created / edited since then, possibly with a stale status
+            | Q(updated_at__gte=last.started_at or last.ran_at)
+        )
+
+    scanned = updated = 0
+    last_pk = 0
+    while True:
+        chunk = list(
+            candidates.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not chunk:
+            break
+        scanned += len(chunk)
+        last_pk = chunk[-1]
+        updated += FoodItem.objects.filter(pk__in=chunk).refresh_statuses(today)
+
+    sweep = StatusSweep.objects.create(
+        swept_through=today,
+        started_at=started_at,
+        rows_scanned=scanned,
+        rows_updated=updated,
+        duration_ms=round(1000 * (time.perf_counter() - started)),
+    )
+    logger.info(
+        f"Expiry status sweep through {today}: {scanned} scanned, {updated} updated "
+        f"in {sweep.duration_ms} ms"
+    )
+    return sweep
+
+
+def run_expiry_sweep():
+    return sweep_expiry_statuses(settings.STATUS_SWEEP_CHUNK_SIZE).rows_updated
+
+
+if celery_app is not None:
+    sweep_expiry_statuses_task = celery_app.task(name="user.sweep_expiry_statuses")(
+        run_expiry_sweep
+    )
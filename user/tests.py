@@ -1,3 +1,284 @@
-from django.test import TestCase
+import glob
+import hashlib
+import importlib.util
+import io
+import os
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+
+from . import expiry
+from .detection import compare_detections, create_backend
+from .models import DetectedObject, FoodItem, StatusSweep
+from .serializers import (
+    DETECTED_OBJECT_COLUMNS,
+    DetectedObjectSerializer,
+    FoodItemSerializer,
+    food_item_values,
+    render_detected_objects,
+    render_food_items,
+)
+from .tasks import sweep_expiry_statuses
 
 # Create your tests here.
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "detection")
+
+
+def installed(*modules):
+    return all(importlib.util.find_spec(module) for module in modules)
+
+
+@unittest.skipUnless(
+    installed("cv2", "ultralytics", "onnxruntime"),
+    "needs opencv, ultralytics and onnxruntime",
+)
+class DetectorParityTest(SimpleTestCase):
+    """The ONNX Runtime backends must find what the ultralytics reference finds."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import cv2
+
+        paths = sorted(glob.glob(os.path.join(FIXTURES, "*.[jp][pn]g")))
+        cls.frames = [cv2.imread(path) for path in paths]
+        reference = create_backend(
+            "ultralytics", settings.DETECTION_MODEL_WEIGHTS, settings.DETECTION_IMGSZ
+        )
+        reference.load()
+        cls.expected = [reference(frame) for frame in cls.frames]
+
+    def test_fixtures_are_distinct_images(self):
+        self.assertGreaterEqual(len(self.frames), 3)
+        self.assertTrue(all(frame is not None for frame in self.frames))
+        digests = {hashlib.sha256(frame.tobytes()).hexdigest() for frame in self.frames}
+        self.assertEqual(len(digests), len(self.frames))
+
+    def assert_parity(self, name, min_match, max_confidence_delta):
+        backend = create_backend(
+            name, settings.DETECTION_MODEL_WEIGHTS, settings.DETECTION_IMGSZ
+        )
+        backend.load()
+        actual = [backend(frame) for frame in self.frames]
+
+        parity = compare_detections(self.expected, actual, min_iou=0.5)
+        self.assertGreater(parity["total"], 0, "reference found nothing to compare")
+        self.assertGreaterEqual(parity["match_rate"], min_match, parity["missed"])
+        self.assertLessEqual(parity["max_confidence_delta"], max_confidence_delta)
+
+    def test_onnx_matches_reference(self):
+        self.assert_parity("onnx", min_match=0.9, max_confidence_delta=0.1)
+
+    @unittest.skipUnless(installed("onnx"), "quantizing needs the onnx package")
+    def test_onnx_int8_matches_reference(self):
+        # dynamic INT8 weights shift scores a little and can drop borderline boxes
+        self.assert_parity("onnx-int8", min_match=0.75, max_confidence_delta=0.2)
+
+
+class PlainRowsTest(TestCase):
+    """The ``.values()`` fast path must render the same bytes as the serializers."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("rows", password="secret")
+        today = timezone.now().date()
+        FoodItem.objects.create(
+            user=self.user, name="Milk", expiration_date=today, status="expired"
+        )
+        FoodItem.objects.create(
+            user=self.user,
+            name="Crème fraîche \u2028",
+            expiration_date=today + timedelta(days=5),
+            category="dairy",
+        )
+        image = FoodItem.objects.create(
+            user=self.user, name="Apple", expiration_date=today, category="fruits"
+        )
+        # a plain name update, so no file has to exist
+        FoodItem.objects.filter(pk=image.pk).update(
+            image="food_images/ab/abcdef.jpg",
+            image_medium="food_images/variants/ab/abcdef.webp",
+            image_thumbnail="food_images/variants/cd/cdef01.webp",
+        )
+        for confidence in (0.8734, 0.5, 1e-05):
+            DetectedObject.objects.create(
+                user=self.user, name="apple", confidence=confidence, frame_count=3
+            )
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_food_items(self):
+        items = FoodItem.objects.filter(user=self.user)
+        expected = self.render(FoodItemSerializer(items, many=True).data)
+        self.assertEqual(
+            self.render(render_food_items(food_item_values(items))), expected
+        )
+
+    def test_food_item_fields(self):
+        items = FoodItem.objects.filter(user=self.user)
+        fields = ["name", "image_thumbnail", "days_until_expiry"]
+        expected = [
+            {field: item[field] for field in fields}
+            for item in FoodItemSerializer(items, many=True).data
+        ]
+        rows = food_item_values(items, fields)
+        self.assertEqual(
+            self.render(render_food_items(rows, fields)), self.render(expected)
+        )
+
+    def test_detected_objects(self):
+        objects = DetectedObject.objects.filter(user=self.user).order_by("id")
+        expected = self.render(DetectedObjectSerializer(objects, many=True).data)
+        rows = objects.values(*DETECTED_OBJECT_COLUMNS)
+        self.assertEqual(self.render(render_detected_objects(rows)), expected)
+
+
+def png(shade=0):
+    """A small gradient PNG; ``shade`` changes one corner pixel."""
+    picture = Image.new("L", (64, 64))
+    picture.putdata([(x * 4 + y) % 256 for y in range(64) for x in range(64)])
+    picture.putpixel((0, 0), shade)
+    buffer = io.BytesIO()
+    picture.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FailingExpiryModel(expiry.StaticExpiryModel):
+    def generate_content(self, contents):
+        self.calls += 1
+        raise RuntimeError("model unavailable")
+
+
+@override_settings(
+    EXPIRY_MODEL="user.expiry.StaticExpiryModel",
+    EXPIRY_STATIC_DATE="12th Jan 2030",
+    EXPIRY_CACHE_PHASH_DISTANCE=0,
+)
+class ExpiryCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(expiry, "cache_stats", expiry.ExpiryCacheStats())
+        self.stats = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def extract(self, data, model=None):
+        return expiry.extract_expiry_date_from_image(data, model=model)
+
+    def test_configured_model(self):
+        self.assertEqual(self.extract(png()), "12th Jan 2030")
+
+    def test_exact_hit_skips_the_model(self):
+        model = expiry.StaticExpiryModel()
+        self.assertEqual(self.extract(png(), model), "12th Jan 2030")
+        self.assertEqual(self.extract(png(), model), "12th Jan 2030")
+        self.assertEqual(model.calls, 1)
+        stats = self.stats.snapshot()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_different_image_misses(self):
+        model = expiry.StaticExpiryModel()
+        self.extract(png(), model)
+        self.extract(png(shade=255), model)
+        self.assertEqual(model.calls, 2)
+        stats = self.stats.snapshot()
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 2))
+        self.assertEqual(stats["saved_ms"], 0)
+
+    @override_settings(EXPIRY_CACHE_PHASH_DISTANCE=4)
+    def test_near_duplicate_does_not_replace_the_model(self):
+        self.extract(png(), expiry.StaticExpiryModel("12th Jan 2030"))
+        model = expiry.StaticExpiryModel("3rd Mar 2031")
+        self.assertEqual(self.extract(png(shade=255), model), "3rd Mar 2031")
+        self.assertEqual(model.calls, 1)
+        self.assertEqual(self.stats.snapshot()["near_hits"], 0)
+
+    @override_settings(EXPIRY_CACHE_PHASH_DISTANCE=4)
+    def test_near_duplicate_answers_when_the_model_fails(self):
+        self.extract(png(), expiry.StaticExpiryModel("12th Jan 2030"))
+        model = FailingExpiryModel()
+        self.assertEqual(self.extract(png(shade=255), model), "12th Jan 2030")
+        stats = self.stats.snapshot()
+        self.assertEqual((stats["near_hits"], stats["hits"]), (1, 0))
+        # the fallback answer is not cached under the new photo's hash
+        self.assertEqual(self.extract(png(shade=255), model), "12th Jan 2030")
+        self.assertEqual(model.calls, 2)
+
+    def test_model_failure_without_a_similar_photo(self):
+        self.assertIsNone(self.extract(png(), FailingExpiryModel()))
+        self.assertEqual(self.stats.snapshot()["misses"], 0)
+
+
+class StatusSweepTest(TestCase):
+    today = date(2026, 10, 1)
+
+    def setUp(self):
+        self.user = User.objects.create_user("sweep", password="secret")
+
+    def item(self, days, status="fresh"):
+        return FoodItem.objects.create(
+            user=self.user,
+            name=f"in {days} days",
+            expiration_date=self.today + timedelta(days=days),
+            status=status,
+        )
+
+    def statuses(self, *items):
+        return [FoodItem.objects.get(pk=item.pk).status for item in items]
+
+    def age_all_rows(self):
+        # as if nothing had been edited since before the previous sweep
+        FoodItem.objects.update(updated_at=timezone.now() - timedelta(days=1))
+
+    def test_first_run_sweeps_everything(self):
+        items = [
+            self.item(-3),
+            self.item(1),
+            self.item(10, status="expired"),
+            self.item(-3, status="used"),
+        ]
+        sweep = sweep_expiry_statuses(chunk_size=2, today=self.today)
+        self.assertEqual(
+            self.statuses(*items), ["expired", "expiring_soon", "fresh", "used"]
+        )
+        self.assertEqual((sweep.rows_scanned, sweep.rows_updated), (3, 3))
+        self.assertEqual(sweep.swept_through, self.today)
+
+    def test_same_day_rerun_picks_up_edited_rows(self):
+        sweep_expiry_statuses(today=self.today)
+        untouched = self.item(-10)
+        self.age_all_rows()
+        edited = self.item(-1)
+
+        sweep = sweep_expiry_statuses(today=self.today)
+        self.assertEqual(self.statuses(edited, untouched), ["expired", "fresh"])
+        self.assertEqual(sweep.rows_updated, 1)
+        self.assertEqual(StatusSweep.objects.count(), 2)
+
+        # a full run still catches rows outside every window
+        sweep_expiry_statuses(today=self.today, full=True)
+        self.assertEqual(self.statuses(untouched), ["expired"])
+
+    def test_skipped_days(self):
+        items = [
+            self.item(3),
+            self.item(10),
+            self.item(1, status="expiring_soon"),
+            self.item(6),
+        ]
+        sweep_expiry_statuses(today=self.today)
+        self.age_all_rows()
+
+        sweep = sweep_expiry_statuses(today=self.today + timedelta(days=5))
+        self.assertEqual(
+            self.statuses(*items), ["expired", "fresh", "expired", "expiring_soon"]
+        )
+        self.assertEqual(sweep.rows_updated, 3)
@@ -0,0 +1,112 @@
+import itertools
+import math
+
+from django.utils import timezone
+
+
+def iou(box_a, box_b):
+    """Intersection over union of two (x1, y1, x2, y2) boxes."""
+    x1, y1 = max(box_a[0], box_b[0]), max(box_a[1], box_b[1])
+    x2, y2 = min(box_a[2], box_b[2]), min(box_a[3], box_b[3])
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    if not intersection:
+        return 0.0
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    return intersection / float(area_a + area_b - intersection)
+
+
+def centroid_distance(box_a, box_b):
+    """Distance between box centres, relative to the diagonal of ``box_a``."""
+    ax, ay = (box_a[0] + box_a[2]) / 2, (box_a[1] + box_a[3]) / 2
+    bx, by = (box_b[0] + box_b[2]) / 2, (box_b[1] + box_b[3]) / 2
+    diagonal = math.hypot(box_a[2] - box_a[0], box_a[3] - box_a[1]) or 1.0
+    return math.hypot(ax - bx, ay - by) / diagonal
+
+
+class Track:
+    """One physical object followed across frames."""
+
+    def __init__(self, track_id, detection, now):
+        self.id = track_id
+        self.label = detection.label
+        self.box = detection.box
+        self.first_seen = now
+        self.last_seen = now
+        self.max_confidence = detection.confidence
+        self.frame_count = 1
+        self.misses = 0
+
+    def update(self, detection, now):
+        self.box = detection.box
+        self.last_seen = now
+        self.max_confidence = max(self.max_confidence, detection.confidence)
+        self.frame_count += 1
+        self.misses = 0
+
+
+class IoUTracker:
+    """
+    Greedy IoU tracker with a centroid-distance fallback.
+
+    Detections are only matched to tracks with the same label. A track is
+    finished once it has gone unmatched for ``max_misses`` inferred frames.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=0.5, max_misses=5):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_misses = max_misses
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def _match(self, detections):
+        pairs = []
+        for t, track in enumerate(self.tracks):
+            for d, detection in enumerate(detections):
+                if track.label != detection.label:
+                    continue
+                overlap = iou(track.box, detection.box)
+                if overlap >= self.iou_threshold:
+                    # IoU matches always rank ahead of centroid matches
+                    pairs.append((1.0 + overlap, t, d))
+                else:
+                    distance = centroid_distance(track.box, detection.box)
+                    if distance <= self.max_distance:
+                        pairs.append((1.0 - distance, t, d))
+
+        matches, used_tracks, used_detections = [], set(), set()
+        for _, t, d in sorted(pairs, reverse=True):
+            if t in used_tracks or d in used_detections:
+                continue
+            used_tracks.add(t)
+            used_detections.add(d)
+            matches.append((t, d))
+        return matches, used_tracks, used_detections
+
+    def update(self, detections, now=None):
+        """Associates one frame's detections and returns the tracks that ended."""
+        now = now or timezone.now()
+        matches, used_tracks, used_detections = self._match(detections)
+
+        for t, d in matches:
+            self.tracks[t].update(detections[d], now)
+
+        finished, active = [], []
+        for t, track in enumerate(self.tracks):
+            if t not in used_tracks:
+                track.misses += 1
+            (finished if track.misses >= self.max_misses else active).append(track)
+
+        active.extend(
+            Track(next(self._ids), detection, now)
+            for d, detection in enumerate(detections)
+            if d not in used_detections
+        )
+        self.tracks = active
+        return finished
+
+    def flush(self):
+        """Ends and returns every open track."""
+        finished, self.tracks = self.tracks, []
+        return finished
@@ -0,0 +1,20 @@
+from .batch import decode_image
+
+
+class SharedUpload:
+    """
+    An uploaded file read exactly once and shared by every consumer.
+
+    Image resizing, the expiry job and the detector all work from the same
+    bytes object, so an upload is never re-read from a possibly exhausted
+    stream.
+    """
+
+    def __init__(self, uploaded_file):
+        self.name = uploaded_file.name
+        uploaded_file.seek(0)
+        self.data = b"".join(uploaded_file.chunks())
+
+    def decode_image(self):
+        """Decodes the bytes into a BGR frame for the detector, or None."""
+        return decode_image(self.data)
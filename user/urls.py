@@ -5,11 +5,16 @@ from .views import (
     recipe_slider,
     rotting_index,
     video_feed,
+    video_feed_async,
     community,
     detect,
     detected_objects,
+    detect_batch,
     index,
     dashboard_data,
+    extraction_status,
+    item_events,
+    expiring_items,
 )
 
 app_name = "user"
@@ -20,15 +25,20 @@ urlpatterns = [
     path("", dashboard, name="dashboard"),
     path("dashboard/", dashboard, name="dashboard"),
     path("dashboard-data/", dashboard_data, name="dashboard-data"),
+    path("events/", item_events, name="item_events"),
+    path("expiring/", expiring_items, name="expiring_items"),
     path("community/", community, name="community"),
     # Food analysis features
     path("add/", upload_image_and_voice, name="upload_image_and_voice"),
+    path("add/<int:item_id>/status/", extraction_status, name="extraction_status"),
     path("get_detections/", detected_objects, name="detected_objects"),
     path("recipe_slider/", recipe_slider, name="recipe_slider"),
     path("rotting_index/", rotting_index, name="rotting_index"),
     # Video and detection endpoints
     path("video_feed/", video_feed, name="video_feed"),
+    path("video_feed_async/", video_feed_async, name="video_feed_async"),
     path("food_detect/", detect, name="detect"),
+    path("detect_batch/", detect_batch, name="detect_batch"),
     # path("video_feed1/", video_feed1, name="video_feed1"),
     # Testing
     # path("test/", test, name="test"),
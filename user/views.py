@@ -1,27 +1,44 @@
-import os
 import logging
-import cv2
-from PIL import Image
+from datetime import timedelta
 from dotenv import load_dotenv
 
-from django.shortcuts import render
-from django.core.files.storage import FileSystemStorage
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_http_methods
+from asgiref.sync import sync_to_async
 from rest_framework.decorators import (
     api_view,
     permission_classes,
     authentication_classes,
 )
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from . import dashboard_cache, events
+from .batch import detect_frames, get_executor, read_video_frames
 from .models import FoodItem, DetectedObject
-from .serializers import FoodItemSerializer, DetectedObjectSerializer
+from .serializers import (
+    DETECTED_OBJECT_COLUMNS,
+    FoodItemSerializer,
+    food_item_values,
+    render_detected_objects,
+    render_food_items,
+)
+from .detection import yolo_provider
+from .images import ingest_image
+from .pagination import FoodItemCursorPagination
+from .sinks import DetectionSink
+from .tasks import enqueue_expiry_extraction
+from .tracking import IoUTracker
+from .uploads import SharedUpload
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework_simplejwt.authentication import JWTAuthentication
-
-
-from ultralytics import YOLO
-
-import google.generativeai as genai
+from rest_framework_simplejwt.exceptions import InvalidToken
 
 
 load_dotenv()
@@ -29,29 +46,6 @@ load_dotenv()
 # set up logging for debuggind
 logger = logging.getLogger(__name__)
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-
-# YOLO Model for Object Detection
-YOLO_MODEL = YOLO("yolov8n.pt")
-YOLO_MODEL.to("cpu")
-
-
-def extract_expiry_date_from_image(image):
-    try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(
-            [
-                "Extract the expiry date from this image. Only return the date, e.g., '12th Jan 2024'",
-                Image.open(image),
-            ]
-        )
-        return response.text.strip()
-    except Exception as e:
-        logger.error(f"Error processing image: {e}")
-        return None
-
 
 def index(request):
     return render(request, "base.html")
@@ -66,75 +60,411 @@ def upload_image_and_voice(request):
         expiry_date = request.POST.get("expiry_date", "")
         uploaded_image = request.FILES.get("image")
 
-        if uploaded_image:
-            fs = FileSystemStorage()
-            filename = fs.save(uploaded_image.name, uploaded_image)
-            image_url = fs.url(filename)
-            expiry_date = extract_expiry_date_from_image(uploaded_image) or expiry_date
+        if food_name and (expiry_date or uploaded_image):
+            # read once; resizing, storage and the extraction job share the bytes
+            upload = SharedUpload(uploaded_image) if uploaded_image else None
+            images = ingest_image(upload.data, upload.name) if upload else {}
 
-        if food_name and expiry_date:
-            FoodItem.objects.create(
+            # With a photo the item is created right away with a provisional date;
+            # the extracted date replaces it once the background job finishes
+            item = FoodItem.objects.create(
                 user=request.user,
                 name=food_name,
-                expiration_date=expiry_date,
-                image=uploaded_image,
+                expiration_date=expiry_date or provisional_expiration(),
+                image=images.get("full"),
+                image_medium=images.get("medium"),
+                image_thumbnail=images.get("thumbnail"),
+                extraction_status="pending" if upload else "none",
             )
+            if upload:
+                # the model reads a label just as well from the ~800px copy
+                preview = images.get("medium", images["full"])
+                enqueue_expiry_extraction(item.id, image_data=preview.file.getvalue())
             return JsonResponse(
-                {"expiry_date": expiry_date, "redirect_url": "/dashboard"}
+                {
+                    "id": item.id,
+                    "expiry_date": str(item.expiration_date),
+                    "extraction_status": item.extraction_status,
+                    "status_url": reverse("user:extraction_status", args=[item.id]),
+                    "redirect_url": "/dashboard",
+                }
             )
 
     return render(request, "user/voice_input_form.html")
 
 
+def provisional_expiration():
+    return timezone.now().date() + timedelta(days=settings.EXPIRY_PROVISIONAL_DAYS)
+
+
 @api_view(["GET"])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+def extraction_status(request, item_id):
+    """Lets clients poll the background expiry extraction of one food item."""
+    item = get_object_or_404(
+        FoodItem.objects.only(
+            "id", "user_id", "status", "expiration_date", "extraction_status"
+        ),
+        pk=item_id,
+        user=request.user,
+    )
+    return Response(
+        {
+            "id": item.id,
+            "extraction_status": item.extraction_status,
+            "expiration_date": item.expiration_date,
+            "status": item.status,
+        }
+    )
+
+
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+@condition(
+    etag_func=dashboard_cache.etag, last_modified_func=dashboard_cache.last_modified
+)
 def dashboard(request):
     food_items = FoodItem.objects.filter(user=request.user)
-    for item in food_items:
-        item.update_status()
+    # one UPDATE for the rows whose status boundary has passed, not a save per item
+    food_items.refresh_statuses()
     return render(request, "user/dashboard.html", {"food_items": food_items})
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(
+    etag_func=dashboard_cache.etag, last_modified_func=dashboard_cache.last_modified
+)
 def dashboard_data(request):
+    """
+    Lists the user's food items, newest first.
+
+    Optional query parameters:
+    - ``status`` / ``category``: comma-separated values to keep
+    - ``expires_after`` / ``expires_before``: inclusive ISO date bounds
+    - ``fields``: comma-separated serializer fields to return
+    - ``cursor`` / ``page_size``: keyset pagination; without either the whole
+      list is returned as before
+
+    Payloads are cached per user and query string until the user's items change
+    or the day rolls over; ``ETag`` / ``Last-Modified`` allow 304 responses.
+    """
+    return Response(
+        dashboard_cache.get_or_build(request, lambda: dashboard_payload(request))
+    )
+
+
+def dashboard_payload(request):
+    food_items = filter_food_items(
+        FoodItem.objects.filter(user=request.user), request.query_params
+    )
+    fields = requested_fields(request.query_params)
+    # plain .values() rows rendered like FoodItemSerializer, without its per-field
+    # machinery; days until expiry are counted from one shared "today"
+    rows = food_item_values(food_items, fields)
+
+    if not {"cursor", "page_size"} & set(request.query_params):
+        return {"food_items": render_food_items(rows, fields)}
+
+    paginator = FoodItemCursorPagination()
+    page = paginator.paginate_queryset(rows, request)
+    return {
+        "food_items": render_food_items(page, fields),
+        "next": paginator.get_next_link(),
+        "previous": paginator.get_previous_link(),
+    }
+
+
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+@condition(
+    etag_func=dashboard_cache.etag, last_modified_func=dashboard_cache.last_modified
+)
+def expiring_items(request):
+    """
+    The next ``limit`` items to expire, plus item counts per status.
+
+    Optional query parameters: ``limit`` (default 10), ``category`` and
+    ``include_expired`` to also list items already past their date.
+    """
+    return Response(
+        dashboard_cache.get_or_build(request, lambda: expiring_payload(request))
+    )
+
+
+def expiring_payload(request):
+    params = request.query_params
+    try:
+        limit = int(params.get("limit", 10))
+    except ValueError:
+        raise ValidationError({"limit": "Expected a number"})
+    if not 0 < limit <= settings.DASHBOARD_MAX_PAGE_SIZE:
+        raise ValidationError(
+            {"limit": f"Must be between 1 and {settings.DASHBOARD_MAX_PAGE_SIZE}"}
+        )
+    category = params.get("category")
+    if category and category not in dict(FoodItem.CATEGORY_CHOICES):
+        raise ValidationError({"category": f"Unknown category {category!r}"})
+
+    today = timezone.now().date()
     food_items = FoodItem.objects.filter(user=request.user)
-    serializer = FoodItemSerializer(food_items, many=True)
-    return Response({"food_items": serializer.data})
+    soonest = food_items.expiring_first(
+        today,
+        category=category,
+        include_expired=params.get("include_expired") in ("1", "true"),
+    )
+    return {
+        "food_items": render_food_items(food_item_values(soonest)[:limit], today=today),
+        "counts": food_items.status_counts(today),
+    }
+
+
+def _split(value):
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Expected a date as YYYY-MM-DD"})
+    return parsed
+
+
+def filter_food_items(queryset, params):
+    """Applies the status, category and expiry-range query filters."""
+    for name, choices in (
+        ("status", FoodItem.STATUS_CHOICES),
+        ("category", FoodItem.CATEGORY_CHOICES),
+    ):
+        values = _split(params.get(name, ""))
+        unknown = set(values) - {value for value, _ in choices}
+        if unknown:
+            raise ValidationError({name: f"Unknown values: {sorted(unknown)}"})
+        if values:
+            queryset = queryset.filter(**{f"{name}__in": values})
+
+    expires_after = _parse_date_param(params, "expires_after")
+    expires_before = _parse_date_param(params, "expires_before")
+    if expires_after:
+        queryset = queryset.filter(expiration_date__gte=expires_after)
+    if expires_before:
+        queryset = queryset.filter(expiration_date__lte=expires_before)
+    return queryset
+
+
+def requested_fields(params):
+    """The ``?fields=`` sparse fieldset, or None for every field."""
+    if "fields" not in params:
+        return None
+    fields = _split(params["fields"])
+    unknown = set(fields) - set(FoodItemSerializer.Meta.fields)
+    if unknown or not fields:
+        raise ValidationError(
+            {"fields": f"Choose from {', '.join(FoodItemSerializer.Meta.fields)}"}
+        )
+    return fields
 
 
 @api_view(["POST"])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def video_feed(request):
-    def gen_frames():
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        cap.set(cv2.CAP_PROP_FPS, 15)
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            results = YOLO_MODEL(frame)
-            for result in results:
-                for box in result.boxes:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    label = result.names[int(box.cls[0].item())]
-                    confidence = round(box.conf[0].item(), 2)
-                    DetectedObject.objects.create(
-                        name=label, confidence=confidence, user=request.user
-                    )
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            _, jpeg = cv2.imencode(".jpg", frame)
-            frame = jpeg.tobytes()
-            yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + frame + b"\r\n\r\n")
-        cap.release()
+    # cv2 is only needed once someone actually opens the camera
+    from .streaming import DetectionStream, MotionGate
+
+    sink = DetectionSink(
+        request.user,
+        batch_size=settings.DETECTION_SINK_BATCH_SIZE,
+        flush_interval=settings.DETECTION_SINK_FLUSH_INTERVAL,
+        tracker=IoUTracker(max_misses=settings.DETECTION_TRACK_MAX_MISSES),
+    )
+    stream = DetectionStream(
+        yolo_provider.get(),
+        source=0,
+        sink=sink,
+        stride=settings.DETECTION_INFERENCE_STRIDE,
+        motion_gate=MotionGate(threshold=settings.DETECTION_MOTION_THRESHOLD),
+    )
 
     return StreamingHttpResponse(
-        gen_frames(), content_type="multipart/x-mixed-replace; boundary=frame"
+        stream.mjpeg(), content_type="multipart/x-mixed-replace; boundary=frame"
+    )
+
+
+async def authenticate_jwt(request, allow_query_token=False):
+    """
+    Authenticates a plain (non-DRF) async request with the JWT header.
+
+    With ``allow_query_token`` an ``?access_token=`` parameter is accepted too,
+    for clients such as ``EventSource`` that cannot set headers.
+    """
+    authentication = JWTAuthentication()
+    token = request.GET.get("access_token") if allow_query_token else None
+    try:
+        if token and "HTTP_AUTHORIZATION" not in request.META:
+            validated = await sync_to_async(authentication.get_validated_token)(token)
+            return await sync_to_async(authentication.get_user)(validated)
+        result = await sync_to_async(authentication.authenticate)(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return result[0] if result else None
+
+
+def asgi_required():
+    """
+    Response for async streaming views reached through the WSGI app.
+
+    Django's WSGI handler collects an async iterator into a list before sending
+    it, so an endless stream would hang and pin the worker.
+    """
+    return JsonResponse(
+        {"error": "This stream is only available when served over ASGI"},
+        status=501,
+    )
+
+
+@require_http_methods(["GET", "POST"])
+async def video_feed_async(request):
+    """
+    ASGI-native version of ``video_feed``.
+
+    The response is an async generator, so an open stream does not pin a worker
+    thread; blocking capture, inference and encoding stay on background threads.
+    """
+    if not isinstance(request, ASGIRequest):
+        return asgi_required()
+    user = await authenticate_jwt(request)
+    if user is None:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    from .streaming import DetectionStream, MotionGate
+
+    detector = await sync_to_async(yolo_provider.get, thread_sensitive=False)()
+    sink = DetectionSink(
+        user,
+        batch_size=settings.DETECTION_SINK_BATCH_SIZE,
+        flush_interval=settings.DETECTION_SINK_FLUSH_INTERVAL,
+        tracker=IoUTracker(max_misses=settings.DETECTION_TRACK_MAX_MISSES),
+    )
+    stream = DetectionStream(
+        detector,
+        source=0,
+        sink=sink,
+        stride=settings.DETECTION_INFERENCE_STRIDE,
+        motion_gate=MotionGate(threshold=settings.DETECTION_MOTION_THRESHOLD),
+    )
+    return StreamingHttpResponse(
+        stream.amjpeg(), content_type="multipart/x-mixed-replace; boundary=frame"
+    )
+
+
+@require_http_methods(["GET"])
+async def item_events(request):
+    """
+    Server-sent events for the user's food items (ASGI only).
+
+    Emits ``item.created``, ``item.updated``, ``item.deleted`` and
+    ``item.status`` events with the changed fields, so clients refetch only
+    what changed instead of polling ``dashboard_data``; ``resync`` means events
+    were dropped and everything should be refetched.
+    """
+    if not isinstance(request, ASGIRequest):
+        return asgi_required()
+    user = await authenticate_jwt(request, allow_query_token=True)
+    if user is None:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    response = StreamingHttpResponse(
+        events.event_stream(user.id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # stop nginx from buffering the stream
+    return response
+
+
+@api_view(["POST"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def detect_batch(request):
+    """Detects food in many uploaded photos, or sampled frames of one video."""
+    images = request.FILES.getlist("images")
+    video = request.FILES.get("video")
+    if not images and not video:
+        return Response(
+            {"error": "Upload one or more 'images' or a 'video'"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(images) > settings.DETECTION_BATCH_MAX_IMAGES:
+        return Response(
+            {
+                "error": f"At most {settings.DETECTION_BATCH_MAX_IMAGES} images "
+                "per request"
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if video:
+        frames = read_video_frames(
+            video, max_frames=settings.DETECTION_BATCH_MAX_IMAGES
+        )
+    else:
+        uploads = [SharedUpload(image) for image in images]
+        decoded = get_executor().map(SharedUpload.decode_image, uploads)
+        frames = list(zip([upload.name for upload in uploads], decoded))
+
+    unreadable = [name for name, frame in frames if frame is None]
+    if unreadable or not frames:
+        return Response(
+            {"error": "Could not decode uploaded media", "files": unreadable},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    detector = yolo_provider.get()
+    results, elapsed = detect_frames(detector, [frame for _, frame in frames])
+
+    # frames of one video show the same objects, so store tracks rather than boxes
+    sink = DetectionSink(
+        request.user,
+        batch_size=settings.DETECTION_SINK_BATCH_SIZE,
+        flush_interval=float("inf"),
+        tracker=IoUTracker() if video else None,
+    )
+    for frame_id, detections in enumerate(results):
+        sink.add(frame_id, detections)
+    sink.close()
+
+    logger.info(
+        f"Batch detection: {len(frames)} frames in {elapsed:.2f}s "
+        f"with {detector.name}, {sink.rows_flushed} rows written"
+    )
+    return Response(
+        {
+            "results": [
+                {
+                    "image": name,
+                    "detections": [
+                        {
+                            "label": detection.label,
+                            "confidence": detection.confidence,
+                            "box": list(detection.box),
+                        }
+                        for detection in detections
+                    ],
+                }
+                for (name, _), detections in zip(frames, results)
+            ],
+            "rows_written": sink.rows_flushed,
+            "inference_ms": round(1000 * elapsed, 1),
+        }
     )
 
 
@@ -143,8 +473,8 @@ def video_feed(request):
 @permission_classes([IsAuthenticated])
 def detected_objects(request):
     objects = DetectedObject.objects.filter(user=request.user)
-    serializer = DetectedObjectSerializer(objects, many=True)
-    return Response(serializer.data)
+    # same output as DetectedObjectSerializer, built from plain rows
+    return Response(render_detected_objects(objects.values(*DETECTED_OBJECT_COLUMNS)))
 
 
 @api_view(["GET"])